@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import scrolledtext, ttk
 import tkinter.font as tkfont
 import logging
+import multiprocessing
 import threading
 from io import StringIO
 import ctypes
@@ -34,7 +35,7 @@ for p in [path, base_path]:
     if str(p) not in sys.path:
         sys.path.append(str(p))
 
-from libs import abort_manager
+from libs import abort_manager, load_fingerprints
 from loaders.excel_csv_loader import load_multiple_files
 from loaders.sql_view_loader import run_sql_view_loader
 from loaders.scff_data_loader import run_scff_loader
@@ -112,6 +113,8 @@ def run_selected():
     global should_abort
     should_abort = False
     tool_name = selected_tool.get()
+    # Reload files even if their content is already loaded (see libs.load_fingerprints)
+    load_fingerprints.FORCE_RELOAD = force_reload.get()
     log_text.delete(1.0, tk.END)
     status_light.config(text="⏳")     
 
@@ -259,7 +262,7 @@ def launch_tool_gui():
 
 
     
-    global root, selected_tool, log_text, log_stream, status_light
+    global root, selected_tool, force_reload, log_text, log_stream, status_light
 
     hidden_root = tk.Tk()
     hidden_root.withdraw()  # Hide it immediately
@@ -373,6 +376,9 @@ def launch_tool_gui():
     tk.Button(btn_frame, text="Run", width=10, command=lambda: run_selected()).pack(side="left", padx=7)
     tk.Button(btn_frame, text="Abort", width=10, command=abort_process).pack(side="left", padx=7)
 
+    force_reload = tk.BooleanVar(value=False)
+    tk.Checkbutton(btn_frame, text="Force reload", variable=force_reload).pack(side="left", padx=7)
+
     def safe_exit():
         global is_gui_running
         is_gui_running = False
@@ -535,5 +541,7 @@ TOOLS = {
 }
 
 if __name__ == "__main__":
+    # Lets the frozen .exe start the MIS parser's worker processes (loaders.mis_data_loader.PARSE_WORKERS)
+    multiprocessing.freeze_support()
     show_splash()
     launch_tool_gui()
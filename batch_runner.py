@@ -0,0 +1,297 @@
+"""
+Headless batch runner for the HoonyTools loaders (no Tk windows, suitable for scheduled jobs).
+
+Usage:
+    python batch_runner.py manifest.json [--force] [--bulk] [--staging-swap] [--partition-terms] [--batch-size N] [--parse-workers N] [--trace-diagnostics] [--no-parse-cache] [--all-varchar] [--output stats.json]
+
+Manifest (JSON, or YAML if PyYAML is installed):
+    {
+      "connection": "dwh",
+      "schema": "DWH",
+      "loads": [
+        {"file": "data/enroll.csv", "table": "ENROLL_2024"},
+        {"file": "data/book.xlsx", "sheet": "Sheet1", "table": "BOOK_SHEET1"},
+        {"file": "MIS/U23233SX.dat"},
+        {"file": "SCFF/SCFF_Data/2324/Latest/SF_240315.txt", "acyr": "2023"}
+      ]
+    }
+
+- connection: config.ini section to read credentials from (default "dwh"); the
+  HOONYTOOLS_DB_USER / HOONYTOOLS_DB_PASSWORD / HOONYTOOLS_DB_DSN environment variables win.
+- schema: target schema for Excel/CSV loads (default: the connected user). MIS and SCFF load to DWH.
+- loader: "csv", "excel", "mis" or "scff"; inferred from the file extension when omitted.
+- table: required for CSV/Excel; optional for MIS (default MIS_<code>_IN) and SCFF (default from file name).
+- Relative paths are resolved against the manifest's folder.
+
+Loads run back to back on one connection, each committed on success. Files whose content was
+already loaded into the same target, and SCFF files whose datestamp is not newer than the one
+loaded for their table and ACYR, are skipped (status "unchanged") unless --force is given.
+Throughput stats (rows, seconds, rows/sec per table) and the skipped files are written to
+stdout as JSON; logs go to stderr.
+Exit code: 0 all loads succeeded, 1 a load failed or was aborted (Ctrl+C), 2 bad manifest or no connection.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import signal
+import sys
+import time
+from pathlib import Path
+
+from libs import abort_manager, catalog_cache, column_profiler, load_fingerprints, table_utils
+from libs.headless_connector import get_headless_connection
+
+logger = logging.getLogger("batch_runner")
+
+LOADER_BY_EXTENSION = {
+    ".csv": "csv",
+    ".xlsx": "excel",
+    ".xlsm": "excel",
+    ".xls": "excel",
+    ".dat": "mis",
+    ".txt": "scff",
+}
+
+def read_manifest(manifest_path):
+    text = Path(manifest_path).read_text(encoding="utf-8")
+    if Path(manifest_path).suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("YAML manifests need PyYAML (pip install pyyaml); use JSON otherwise.")
+        manifest = yaml.safe_load(text)
+    else:
+        manifest = json.loads(text)
+
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("loads"), list):
+        raise ValueError("Manifest must be an object with a 'loads' list.")
+
+    base_dir = Path(manifest_path).resolve().parent
+    for entry in manifest["loads"]:
+        if not isinstance(entry, dict) or not entry.get("file"):
+            raise ValueError(f"Every load needs a 'file': {entry!r}")
+        entry["file"] = str((base_dir / entry["file"]).resolve())
+        entry["loader"] = (entry.get("loader") or LOADER_BY_EXTENSION.get(Path(entry["file"]).suffix.lower(), "")).lower()
+        if entry["loader"] not in ("csv", "excel", "mis", "scff"):
+            raise ValueError(f"Cannot tell which loader to use for {entry['file']}; set 'loader'.")
+        if entry["loader"] in ("csv", "excel") and not entry.get("table"):
+            raise ValueError(f"CSV/Excel load of {entry['file']} needs a 'table'.")
+    return manifest
+
+def _table_name(name):
+    return name.strip().replace('-', '_').replace(' ', '_').upper()
+
+def run_excel_csv_entry(entry, conn, cursor, schema):
+    from loaders.excel_csv_loader import run_file_job
+    import openpyxl
+    import pandas as pd
+
+    file_path = entry["file"]
+    file_prefix = _table_name(Path(file_path).stem)
+    table_name = _table_name(entry["table"])
+
+    if entry["loader"] == "csv":
+        job = {"file_path": file_path, "file_prefix": file_prefix, "workbook": None, "tables": [(None, table_name)]}
+    else:
+        if file_path.lower().endswith(".xls"):
+            workbook = pd.ExcelFile(file_path)
+            sheets = workbook.sheet_names
+        else:
+            workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+            sheets = workbook.sheetnames
+        sheet = entry.get("sheet") or sheets[0]
+        job = {"file_path": file_path, "file_prefix": file_prefix, "workbook": workbook, "tables": [(sheet, table_name)]}
+
+    skipped_before = len(load_fingerprints.skipped_files())
+    results = run_file_job(cursor, conn, schema, job)
+    if results is None:
+        return None
+    if not results:
+        status = "unchanged" if len(load_fingerprints.skipped_files()) > skipped_before else "failed"
+        return {"table": f"{schema}.{table_name}", "status": status}
+    stats = results[0]
+    return {"table": stats["table"], "rows": stats["rows"], "failed": stats["failed"], "status": "ok",
+            "pending": [(stats["table"], stats["fingerprint"], stats["rows"])]}
+
+def run_mis_entry(entry, conn, cursor):
+    from loaders.mis_data_loader import load_mis_file, mis_load_target
+    from libs.layout_definitions import LAYOUTS
+
+    filename = Path(entry["file"]).name
+    annual_code = filename[3:6]
+    file_code = filename[-6:-4].upper()
+    table_name = _table_name(entry.get("table") or f"MIS_{file_code}_IN")
+    if file_code not in LAYOUTS:
+        logger.error(f"❌ No MIS layout for file code {file_code} ({filename})")
+        return {"table": f"DWH.{table_name}", "status": "failed"}
+
+    target = mis_load_target(table_name, annual_code)
+    unchanged, fingerprint = load_fingerprints.check_unchanged(entry["file"], target, cursor, where=("GI03_TERM_ID", annual_code))
+    if unchanged:
+        return {"table": f"DWH.{table_name}", "status": "unchanged"}
+
+    stats = {}
+    ok = load_mis_file(entry["file"], table_name, annual_code, conn, cursor, LAYOUTS[file_code], file_code, stats=stats,
+                       fingerprint=fingerprint)
+    if not ok:
+        return None if abort_manager.should_abort else {"table": f"DWH.{table_name}", "status": "failed"}
+    return {"table": f"DWH.{table_name}", "rows": stats.get("rows", 0), "failed": stats.get("failed", 0),
+            "rejected": stats.get("rejected", 0), "status": "ok", "pending": [(target, fingerprint, stats.get("rows"))]}
+
+def _scff_table_name(entry):
+    table_name = entry.get("table")
+    if table_name:
+        table_name = _table_name(table_name)
+        return table_name[len("SCFF_"):] if table_name.startswith("SCFF_") else table_name
+    return Path(entry["file"]).name.split('_')[0]
+
+def run_scff_entry(entry, conn, cursor):
+    from loaders.scff_data_loader import load_scff_file
+
+    file_path = Path(entry["file"])
+    acyr = entry.get("acyr")
+    if not acyr:
+        # Same rule as run_scff_loader: SCFF_Data/2324/Latest/<file> -> ACYR "2023"
+        year_folder = file_path.parent.parent.name if file_path.parent.name == "Latest" else file_path.parent.name
+        acyr = str(2000 + int(year_folder[:2]))
+    table_name = _scff_table_name(entry)
+
+    stats = {}
+    ok = load_scff_file(str(file_path), str(acyr), conn, cursor, table_name=table_name, stats=stats)
+    if not ok:
+        return None if abort_manager.should_abort else {"table": f"DWH.SCFF_{table_name}", "status": "failed"}
+    if stats.get("skipped"):
+        return {"table": f"DWH.SCFF_{table_name}", "status": "unchanged"}
+    return {"table": f"DWH.SCFF_{table_name}", "rows": stats.get("rows", 0), "failed": stats.get("failed", 0), "status": "ok",
+            "pending": [(stats["target"], stats["fingerprint"], stats.get("rows"))]}
+
+def run_manifest(manifest):
+    conn = get_headless_connection(manifest.get("connection", "dwh"))
+    if not conn:
+        return None
+
+    schema = (manifest.get("schema") or conn.username).upper()
+    cursor = conn.cursor()
+    abort_manager.reset()
+    load_fingerprints.reset_skipped()
+    catalog_cache.reset()
+
+    scff_tables = [f"SCFF_{_scff_table_name(entry)}" for entry in manifest["loads"] if entry["loader"] == "scff"]
+    if scff_tables:
+        from loaders import scff_data_loader
+        scff_data_loader.reset_datestamp_marks()
+        if scff_data_loader.DATESTAMP_SKIP and not load_fingerprints.FORCE_RELOAD:
+            scff_data_loader.load_datestamp_marks(cursor, scff_tables)
+
+    results = []
+    for entry in manifest["loads"]:
+        if abort_manager.should_abort:
+            results.append({"file": entry["file"], "status": "skipped"})
+            continue
+
+        started = time.perf_counter()
+        try:
+            if entry["loader"] in ("csv", "excel"):
+                result = run_excel_csv_entry(entry, conn, cursor, schema)
+            elif entry["loader"] == "mis":
+                result = run_mis_entry(entry, conn, cursor)
+            else:
+                result = run_scff_entry(entry, conn, cursor)
+            if result is None:
+                result = {"status": "aborted"}
+            elif result["status"] == "ok":
+                conn.commit()
+                for target, fingerprint, rows in result.pop("pending", []):
+                    load_fingerprints.record_load(target, fingerprint, rows, round(time.perf_counter() - started, 3))
+        except Exception as e:
+            logger.error(f"❌ Failed to load {entry['file']}: {e}")
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            result = {"status": "failed", "error": str(e)}
+
+        seconds = time.perf_counter() - started
+        result = {"file": entry["file"], "loader": entry["loader"], **result, "seconds": round(seconds, 3)}
+        if "rows" in result:
+            result["rows_per_sec"] = round(result["rows"] / seconds, 1) if seconds else None
+        results.append(result)
+        logger.info(f"⏱️ {entry['file']}: {result['status']} ({result.get('rows', 0)} rows in {seconds:.1f}s)")
+
+    for closer in (cursor.close, conn.close):
+        try:
+            closer()
+        except Exception:
+            pass
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run HoonyTools loads from a manifest without the GUI.")
+    parser.add_argument("manifest", help="JSON (or YAML) manifest of files to load")
+    parser.add_argument("--force", action="store_true", help="reload files even if their content was already loaded")
+    parser.add_argument("--bulk", action="store_true", help="direct-path bulk mode (NOLOGGING, APPEND_VALUES, deferred indexes)")
+    parser.add_argument("--staging-swap", action="store_true", help="load CSV/Excel tables into a staging table and rename it over the target when done")
+    parser.add_argument("--partition-terms", action="store_true", help="create new MIS tables partitioned by GI03_TERM_ID and reload terms by partition")
+    parser.add_argument("--batch-size", type=int, help=f"rows per executemany batch (default {table_utils.DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--parse-workers", type=int, help="processes used to parse large MIS files (default 1)")
+    parser.add_argument("--trace-diagnostics", action="store_true", help="log every padded/truncated MIS line and rejected row, not just a summary")
+    parser.add_argument("--no-parse-cache", action="store_true", help="always re-parse MIS files instead of reading them from the parse cache")
+    parser.add_argument("--all-varchar", action="store_true", help="create new columns as VARCHAR2(4000) instead of inferring types")
+    parser.add_argument("--output", help="also write the stats JSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    try:
+        manifest = read_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        logger.error(f"❌ Invalid manifest: {e}")
+        return 2
+
+    load_fingerprints.FORCE_RELOAD = args.force
+    table_utils.BULK_LOAD_MODE = args.bulk
+    if args.staging_swap:
+        from loaders import excel_csv_loader
+        excel_csv_loader.STAGING_SWAP_MODE = True
+    if args.batch_size:
+        table_utils.DEFAULT_BATCH_SIZE = args.batch_size
+    if args.parse_workers or args.partition_terms or args.trace_diagnostics:
+        from loaders import mis_data_loader
+        mis_data_loader.PARSE_WORKERS = args.parse_workers or mis_data_loader.PARSE_WORKERS
+        mis_data_loader.PARTITION_BY_TERM = args.partition_terms
+        mis_data_loader.trace_diagnostics(args.trace_diagnostics)
+    if args.no_parse_cache:
+        from libs import parse_cache
+        parse_cache.PARSE_CACHE_ENABLED = False
+    if args.all_varchar:
+        column_profiler.INFER_COLUMN_TYPES = False
+
+    # Ctrl+C stops cleanly between batches, the same way the GUI Abort button does
+    signal.signal(signal.SIGINT, lambda signum, frame: abort_manager.set_abort(True))
+
+    started = time.perf_counter()
+    # The loaders print progress; keep stdout for the JSON report
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run_manifest(manifest)
+    if results is None:
+        return 2
+
+    total_seconds = time.perf_counter() - started
+    total_rows = sum(result.get("rows", 0) for result in results)
+    report = {
+        "results": results,
+        "skipped": load_fingerprints.skipped_files(),
+        "total_rows": total_rows,
+        "total_seconds": round(total_seconds, 3),
+        "rows_per_sec": round(total_rows / total_seconds, 1) if total_seconds else None,
+    }
+    report_json = json.dumps(report, indent=2)
+    print(report_json)
+    if args.output:
+        Path(args.output).write_text(report_json, encoding="utf-8")
+
+    return 0 if all(result["status"] in ("ok", "unchanged") for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,14 @@
+import threading
+
 should_abort = False
 created_tables = set()
 
+# Tables created by each thread, so parallel workers only clean up their own
+_created_by_thread = {}
+_lock = threading.Lock()
+
 import logging
+from libs import catalog_cache
 logger = logging.getLogger(__name__)
 
 def set_abort(value=True):
@@ -11,10 +18,19 @@ def set_abort(value=True):
 def reset():
     global should_abort, created_tables
     should_abort = False
-    created_tables.clear()
+    with _lock:
+        created_tables.clear()
+        _created_by_thread.clear()
 
 def register_created_table(table_name):
-    created_tables.add(table_name.upper())
+    with _lock:
+        created_tables.add(table_name.upper())
+        _created_by_thread.setdefault(threading.get_ident(), set()).add(table_name.upper())
+
+def release_created_tables():
+    """Forgets the tables created by the current thread, e.g. once a worker has committed them."""
+    with _lock:
+        _created_by_thread.pop(threading.get_ident(), None)
 
 def cleanup_on_abort(conn, cursor):
     try:
@@ -25,10 +41,14 @@ def cleanup_on_abort(conn, cursor):
         cursor.execute("SELECT SYS_CONTEXT('USERENV', 'CURRENT_SCHEMA') FROM dual")
         schema = cursor.fetchone()[0]
 
+        with _lock:
+            tables = list(_created_by_thread.get(threading.get_ident(), set()))
+
         try:
-            for table in created_tables:
+            for table in tables:
                 try:
                     cursor.execute(f'DROP TABLE {schema}."{table}" PURGE')
+                    catalog_cache.note_table_dropped(schema, table)
                     logger.info(f"🗑️ Dropped table from abort cleanup: {schema}.{table}")
                 except Exception as e:
                     logger.warning(f"⚠️ Could not drop {table} during abort cleanup: {e}")
@@ -0,0 +1,145 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Per-run copy of the data dictionary: {schema: {table: {"partitioned": bool, "columns": {column: sql_type}}}}.
+# A schema is read with one query the first time it is looked at, and the loaders record the
+# DDL they issue (note_* functions) so it stays current without re-querying. reset() at the
+# start of a run picks up changes made by others since the previous one. A table's column
+# comments are added under "comments" the first time they are asked for.
+_catalogs = {}
+_lock = threading.Lock()
+
+# Rows fetched per round trip while reading a schema's columns
+FETCH_ARRAY_SIZE = 5000
+
+_CATALOG_SQL = """
+    SELECT t.table_name, t.partitioned, c.column_name, c.data_type, c.data_length
+    FROM all_tables t
+    LEFT JOIN all_tab_columns c ON c.owner = t.owner AND c.table_name = t.table_name
+    WHERE t.owner = :owner
+    ORDER BY t.table_name, c.column_id
+"""
+
+_COMMENTS_SQL = """
+    SELECT column_name, comments FROM all_col_comments
+    WHERE owner = :owner AND table_name = :table_name AND comments IS NOT NULL
+"""
+
+def reset():
+    with _lock:
+        _catalogs.clear()
+
+def _sql_type(data_type, data_length):
+    # Same spelling as column_profiler.get_table_column_types
+    return f"VARCHAR2({data_length})" if data_type == "VARCHAR2" else data_type
+
+def _load_schema(cursor, schema):
+    meta_cursor = cursor.connection.cursor()
+    try:
+        meta_cursor.arraysize = FETCH_ARRAY_SIZE
+        meta_cursor.execute(_CATALOG_SQL, owner=schema)
+        tables = {}
+        for table_name, partitioned, column_name, data_type, data_length in meta_cursor:
+            table = tables.setdefault(table_name, {"partitioned": partitioned == "YES", "columns": {}})
+            if column_name is not None:
+                table["columns"][column_name] = _sql_type(data_type, data_length)
+    finally:
+        meta_cursor.close()
+    logger.debug(f"📚 Cached catalog of {schema}: {len(tables)} tables")
+    return tables
+
+def _schema(cursor, schema):
+    schema = schema.upper()
+    with _lock:
+        tables = _catalogs.get(schema)
+        if tables is None:
+            tables = _catalogs[schema] = _load_schema(cursor, schema)
+        return tables
+
+def table_exists(cursor, schema, table_name):
+    return table_name.upper() in _schema(cursor, schema)
+
+def table_columns(cursor, schema, table_name):
+    """Returns {column: sql_type} of schema.table_name in column order, or None if the table does not exist."""
+    table = _schema(cursor, schema).get(table_name.upper())
+    return dict(table["columns"]) if table is not None else None
+
+def column_exists(cursor, schema, table_name, column_name):
+    return column_name.upper() in (table_columns(cursor, schema, table_name) or {})
+
+def is_partitioned(cursor, schema, table_name):
+    table = _schema(cursor, schema).get(table_name.upper())
+    return table is not None and table["partitioned"]
+
+def column_comments(cursor, schema, table_name):
+    """Returns {column: comment} of schema.table_name's commented columns, read once per table per run."""
+    with _lock:
+        table = _catalogs.get(schema.upper(), {}).get(table_name.upper())
+        if table is not None and "comments" in table:
+            return dict(table["comments"])
+    tables = _schema(cursor, schema)
+    meta_cursor = cursor.connection.cursor()
+    try:
+        meta_cursor.execute(_COMMENTS_SQL, owner=schema.upper(), table_name=table_name.upper())
+        comments = dict(meta_cursor.fetchall())
+    finally:
+        meta_cursor.close()
+    with _lock:
+        table = tables.get(table_name.upper())
+        if table is not None:
+            table["comments"] = comments
+    return dict(comments)
+
+def _update(schema, change):
+    # Only schemas already cached are updated; others are read in full when first needed
+    with _lock:
+        tables = _catalogs.get(schema.upper())
+        if tables is not None:
+            change(tables)
+
+def note_table_created(schema, table_name, column_types, partitioned=False):
+    """Records a CREATE TABLE; column_types is {column: sql_type} in column order."""
+    columns = {column.upper(): sql_type for column, sql_type in column_types.items()}
+    table = {"partitioned": partitioned, "columns": columns, "comments": {}}
+    _update(schema, lambda tables: tables.__setitem__(table_name.upper(), table))
+
+def note_table_copied(schema, table_name, source_name, partitioned=False):
+    """Records a CREATE TABLE table_name AS SELECT * FROM source_name."""
+    def copy(tables):
+        source = tables.get(source_name.upper())
+        if source is not None:
+            # CREATE TABLE AS SELECT does not copy column comments
+            tables[table_name.upper()] = {"partitioned": partitioned, "columns": dict(source["columns"]), "comments": {}}
+    _update(schema, copy)
+
+def note_table_dropped(schema, table_name):
+    _update(schema, lambda tables: tables.pop(table_name.upper(), None))
+
+def note_table_renamed(schema, old_name, new_name):
+    def rename(tables):
+        table = tables.pop(old_name.upper(), None)
+        if table is not None:
+            tables[new_name.upper()] = table
+    _update(schema, rename)
+
+def note_column_type(schema, table_name, column_name, sql_type):
+    """Records an ALTER TABLE that added a column or changed its type."""
+    def alter(tables):
+        table = tables.get(table_name.upper())
+        if table is not None:
+            table["columns"][column_name.upper()] = sql_type
+    _update(schema, alter)
+
+def note_column_comment(schema, table_name, column_name, comment):
+    """Records a COMMENT ON COLUMN, or with comment None a column dropped and re-added without one."""
+    def comment_on(tables):
+        table = tables.get(table_name.upper())
+        if table is None or "comments" not in table:
+            return
+        if comment is None:
+            table["comments"].pop(column_name.upper(), None)
+        else:
+            table["comments"][column_name.upper()] = comment
+    _update(schema, comment_on)
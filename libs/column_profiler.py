@@ -0,0 +1,212 @@
+import logging
+import numpy as np
+import pandas as pd
+
+from libs import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+# Set to False to create every non-fixed column as VARCHAR2(4000) like earlier releases
+INFER_COLUMN_TYPES = True
+
+# Inferred VARCHAR2 widths are rounded up to one of these to leave headroom for later rows
+VARCHAR2_WIDTHS = (10, 20, 50, 100, 255, 500, 1000, 2000, 4000)
+MAX_VARCHAR2_WIDTH = 4000
+
+# Numbers whose text comes back unchanged from TO_CHAR: at most 38 digits, no leading zeros
+# (IDs, ZIP codes), no "-0", no "0." prefix (TO_CHAR gives ".5") and no trailing decimal zeros
+NUMBER_PATTERN = r'(?!(?:\D*\d){39})(?:0|-?[1-9]\d*(?:\.\d*[1-9])?)'
+
+# (pattern, strptime format, Oracle format) recognised as DATE columns. Each pattern matches
+# exactly the text its Oracle format gives back, so a DATE column can return to text unchanged.
+DATE_FORMATS = [
+    (r'\d{4}-\d{2}-\d{2}', '%Y-%m-%d', 'YYYY-MM-DD'),
+    (r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}', '%Y-%m-%d %H:%M:%S', 'YYYY-MM-DD HH24:MI:SS'),
+    (r'\d{2}/\d{2}/\d{4}', '%m/%d/%Y', 'MM/DD/YYYY'),
+    (r'[1-9]\d?/[1-9]\d?/[1-9]\d{3}', '%m/%d/%Y', 'FMMM/DD/YYYY'),
+]
+
+# DATE columns carry the Oracle format of their source text as a column comment
+DATE_FORMAT_COMMENT = "HoonyTools date format: "
+# Used to convert DATE columns without one (created by earlier releases) back to text
+DEFAULT_DATE_FORMAT = 'YYYY-MM-DD HH24:MI:SS'
+
+# Temporary column used while converting a NUMBER/DATE column back to text
+_TEMP_COLUMN = "HT_RETYPE_TMP"
+
+def fit_varchar2_width(byte_length):
+    for width in VARCHAR2_WIDTHS:
+        if byte_length <= width:
+            return width
+    return MAX_VARCHAR2_WIDTH
+
+def _non_blank(values):
+    values = values.astype(str)
+    return values[values != '']
+
+def _max_byte_length(values, limit=None):
+    """
+    Longest UTF-8 length of values in bytes. With limit, returns the character maximum without
+    encoding anything when even 4 bytes per character stays within limit, since only whether
+    values fit in limit bytes matters then.
+    """
+    if values.empty:
+        return 0
+    if limit is not None:
+        # Same as .str.len().max(), without building a Series of lengths
+        longest = max(map(len, values.to_numpy()))
+        if longest * 4 <= limit:
+            return longest
+    # One value encoded at a time; .str.encode() would hold a bytes object per row
+    return max(len(value.encode('utf-8')) for value in values.to_numpy())
+
+def _parse_dates(values, oracle_format=None):
+    """
+    Returns (datetimes, Oracle format) if every value matches one DATE_FORMATS entry (only the one
+    with oracle_format when given), else None.
+    """
+    for pattern, date_format, entry_format in DATE_FORMATS:
+        if oracle_format is not None and entry_format != oracle_format:
+            continue
+        if not values.str.fullmatch(pattern).all():
+            continue
+        parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+        if parsed.notna().all():
+            return parsed, entry_format
+    return None
+
+def infer_column_type(values):
+    """
+    Picks NUMBER, DATE or a right-sized VARCHAR2 for a Series of strings ('' is treated as NULL).
+    """
+    non_blank = _non_blank(values)
+    if non_blank.empty:
+        return f"VARCHAR2({VARCHAR2_WIDTHS[0]})"
+    if non_blank.str.fullmatch(NUMBER_PATTERN).all():
+        return "NUMBER"
+    if _parse_dates(non_blank) is not None:
+        return "DATE"
+    return f"VARCHAR2({fit_varchar2_width(_max_byte_length(non_blank))})"
+
+def profile_columns(df, fixed_types=None, infer_types=None):
+    """
+    Returns {column: sql_type} for df. Columns in fixed_types keep their declared type.
+    df can be the whole frame or, for streamed files, the first chunk used as a sample.
+    With infer_types False every other column is VARCHAR2(4000).
+    """
+    fixed_types = fixed_types or {}
+    if infer_types is None:
+        infer_types = INFER_COLUMN_TYPES
+
+    column_types = {}
+    for col in df.columns:
+        if col.upper() in fixed_types:
+            column_types[col] = fixed_types[col.upper()]
+        elif infer_types:
+            column_types[col] = infer_column_type(df[col])
+        else:
+            column_types[col] = f"VARCHAR2({MAX_VARCHAR2_WIDTH})"
+    return column_types
+
+def build_columns_ddl(column_types):
+    return ', '.join(f'"{col}" {sql_type}' for col, sql_type in column_types.items())
+
+def record_date_formats(cursor, schema, table_name, df, column_types):
+    """Stores the format of each DATE column profiled from df as its column comment (see DATE_FORMAT_COMMENT)."""
+    for col, sql_type in column_types.items():
+        if sql_type != "DATE":
+            continue
+        oracle_format = _parse_dates(_non_blank(df[col]))[1]
+        cursor.execute(f"COMMENT ON COLUMN {schema}.{table_name.upper()}.\"{col}\" IS '{DATE_FORMAT_COMMENT}{oracle_format}'")
+        catalog_cache.note_column_comment(schema, table_name, col, f"{DATE_FORMAT_COMMENT}{oracle_format}")
+
+def _date_formats(cursor, schema, table_name):
+    # {column: Oracle format} from the table's column comments, read once per table per run
+    return {
+        col: comment[len(DATE_FORMAT_COMMENT):]
+        for col, comment in catalog_cache.column_comments(cursor, schema, table_name).items()
+        if comment.startswith(DATE_FORMAT_COMMENT)
+    }
+
+def get_table_column_types(cursor, schema, table_name):
+    """Reads {column: sql_type} for an existing table from the catalog cache."""
+    return catalog_cache.table_columns(cursor, schema, table_name) or {}
+
+def _convert_column_to_varchar2(cursor, schema, table_name, col, sql_type, date_format=None):
+    """
+    Rewrites a NUMBER/DATE column as VARCHAR2(4000) holding the text its rows were loaded from
+    (NUMBER_PATTERN values and DATEs in date_format round-trip through TO_CHAR unchanged), and
+    puts it back in its place in the column order.
+    """
+    target = f'{schema}.{table_name.upper()}'
+    columns = list(catalog_cache.table_columns(cursor, schema, table_name) or ())
+    following = columns[columns.index(col) + 1:] if col in columns else []
+    source = f"TO_CHAR(\"{col}\", '{date_format or DEFAULT_DATE_FORMAT}')" if sql_type == "DATE" else f'TO_CHAR("{col}")'
+    cursor.execute(f'ALTER TABLE {target} ADD ("{_TEMP_COLUMN}" VARCHAR2({MAX_VARCHAR2_WIDTH}))')
+    cursor.execute(f'UPDATE {target} SET "{_TEMP_COLUMN}" = {source}')
+    cursor.execute(f'ALTER TABLE {target} DROP COLUMN "{col}"')
+    cursor.execute(f'ALTER TABLE {target} RENAME COLUMN "{_TEMP_COLUMN}" TO "{col}"')
+    catalog_cache.note_column_comment(schema, table_name, col, None)
+    # The new column is last; hiding and re-showing the ones after it moves them back behind it
+    for name in following:
+        cursor.execute(f'ALTER TABLE {target} MODIFY ("{name}" INVISIBLE)')
+    for name in following:
+        cursor.execute(f'ALTER TABLE {target} MODIFY ("{name}" VISIBLE)')
+    catalog_cache.note_column_type(schema, table_name, col, f"VARCHAR2({MAX_VARCHAR2_WIDTH})")
+
+def fit_chunk_to_table(cursor, schema, table_name, chunk, column_types, skip_columns=()):
+    """
+    Makes sure chunk fits the table created from column_types before it is inserted.
+    VARCHAR2 columns that are too narrow are widened, and NUMBER/DATE columns whose values no
+    longer parse are converted to VARCHAR2(4000) with their existing rows kept. column_types is
+    updated in place. Returns chunk with DATE columns converted to datetimes (None for blanks)
+    ready for binding.
+    """
+    skip_columns = {col.upper() for col in skip_columns}
+    prepared = None
+    date_formats = None
+
+    for col, sql_type in list(column_types.items()):
+        if col.upper() in skip_columns or col not in chunk.columns:
+            continue
+        non_blank = _non_blank(chunk[col])
+
+        if sql_type.startswith("VARCHAR2"):
+            current = int(sql_type[len("VARCHAR2("):-1])
+            if current >= MAX_VARCHAR2_WIDTH:
+                continue
+            width = _max_byte_length(non_blank, limit=current)
+            if width > current:
+                new_type = f"VARCHAR2({fit_varchar2_width(width)})"
+                cursor.execute(f'ALTER TABLE {schema}.{table_name.upper()} MODIFY ("{col}" {new_type})')
+                catalog_cache.note_column_type(schema, table_name, col, new_type)
+                column_types[col] = new_type
+                logger.info(f"📐 Widened {schema}.{table_name}.{col} from {sql_type} to {new_type}")
+            continue
+
+        date_format = None
+        if sql_type == "NUMBER":
+            if non_blank.str.fullmatch(NUMBER_PATTERN).all():
+                continue
+        elif sql_type == "DATE":
+            # Only the column's own format fits (any, if it has none), so its rows keep one text form
+            if date_formats is None:
+                date_formats = _date_formats(cursor, schema, table_name)
+            date_format = date_formats.get(col.upper())
+            parsed = _parse_dates(non_blank, date_format)
+            if parsed is not None:
+                parsed = parsed[0]
+                if prepared is None:
+                    prepared = chunk.copy()
+                dates = np.full(len(chunk), None, dtype=object)
+                dates[(chunk[col].astype(str) != '').to_numpy()] = [value.to_pydatetime() for value in parsed]
+                prepared[col] = pd.Series(dates, index=chunk.index, dtype=object)
+                continue
+        else:
+            continue
+
+        _convert_column_to_varchar2(cursor, schema, table_name, col, sql_type, date_format)
+        column_types[col] = f"VARCHAR2({MAX_VARCHAR2_WIDTH})"
+        logger.warning(f"⚠️ Values in {schema}.{table_name}.{col} no longer fit {sql_type}; converted column to VARCHAR2({MAX_VARCHAR2_WIDTH})")
+
+    return prepared if prepared is not None else chunk
@@ -0,0 +1,84 @@
+import logging
+import os
+from configparser import ConfigParser
+
+import oracledb
+
+from config import PROJECT_PATH as BASE_PATH
+from libs import session
+
+# Connections that never open a dialog, for worker threads and unattended (command-line) runs.
+# Nothing here imports tkinter, so servers without Tk can use it.
+config = ConfigParser()
+config.read(BASE_PATH / "libs" / "config.ini")
+
+logger = logging.getLogger(__name__)
+
+def get_worker_connection(force_shared=False):
+    """
+    Opens an additional connection with the credentials already established for this session,
+    without prompting, so it is safe to call from worker threads. Call get_db_connection() first.
+    Returns None if no credentials are available or the connection fails.
+    """
+    if force_shared:
+        section = session.dwh_credentials or (config["dwh"] if config.has_section("dwh") else None)
+    else:
+        section = session.user_credentials
+
+    if not section or not section.get("username") or not section.get("password") or not section.get("dsn"):
+        logger.warning("❌ No saved session credentials available for a worker connection.")
+        return None
+
+    try:
+        return oracledb.connect(
+            user=section.get("username"),
+            password=section.get("password"),
+            dsn=section.get("dsn"),
+            mode=oracledb.DEFAULT_AUTH
+        )
+    except Exception as e:
+        logger.warning(f"❌ Worker connection to {section.get('dsn')} failed: {e}")
+        return None
+
+def get_headless_connection(section_name="dwh"):
+    """
+    Connects without any dialog for unattended (command-line) runs. Credentials come from the
+    HOONYTOOLS_DB_USER / HOONYTOOLS_DB_PASSWORD / HOONYTOOLS_DB_DSN environment variables, or
+    else from the given section of libs/config.ini. They are stored in the session like a GUI
+    login so get_worker_connection() can reuse them. Returns None if the connection fails.
+    """
+    try:
+        oracledb.init_oracle_client()
+        logger.info("✅ Oracle client initialized (Thick mode if available)")
+    except Exception:
+        logger.info("ℹ️ Proceeding with Thin mode")
+
+    section = config[section_name] if config.has_section(section_name) else {}
+    creds = {
+        "username": os.environ.get("HOONYTOOLS_DB_USER") or section.get("username"),
+        "password": os.environ.get("HOONYTOOLS_DB_PASSWORD") or section.get("password"),
+        "dsn": os.environ.get("HOONYTOOLS_DB_DSN") or section.get("dsn"),
+        "save": False
+    }
+    if not creds["username"] or not creds["password"] or not creds["dsn"]:
+        logger.error(f"❌ No credentials found in the environment or the [{section_name}] section of config.ini.")
+        return None
+
+    try:
+        conn = oracledb.connect(
+            user=creds["username"],
+            password=creds["password"],
+            dsn=creds["dsn"],
+            mode=oracledb.DEFAULT_AUTH
+        )
+    except Exception as e:
+        logger.error(f"❌ Oracle connection failed: {e}")
+        return None
+
+    if creds["username"].lower() == "dwh":
+        session.dwh_credentials = creds
+    else:
+        session.user_credentials = creds
+    session.stored_credentials = creds
+    logger.info(f"✅ Connected to {creds['dsn']} as {creds['username']}")
+    return conn
@@ -1,5 +1,8 @@
 # Layout definitions (SP, SF, FA as starting point)
 
+import hashlib
+from collections import namedtuple
+
 LAYOUTS = {
     "AA": [
         ("GI90_RECORD_CODE", 0, 2),
@@ -455,3 +458,91 @@ LAYOUTS = {
         ("FILLER", 76, 80)
     ]    
 }
+
+# Blank FILLER fields are stored as this text (see mis_data_loader.validate_mis_block), so
+# FILLER columns are never narrower than it
+BLANK_FILLER_TEXT = 'None'
+
+# A layout validated and compiled once: field names, slice bounds and widths, the record width,
+# which fields are required (everything but FILLER fields), and a version hash of the fields
+# that changes whenever a name or offset does
+CompiledLayout = namedtuple(
+    "CompiledLayout",
+    ["code", "names", "starts", "ends", "widths", "width", "required", "fillers", "version"],
+)
+
+def is_filler(name):
+    return 'FILLER' in name.upper()
+
+def compile_layout(fields, code=None):
+    """
+    Validates a list of (name, start, end) fields and returns its CompiledLayout. Fields must
+    start at 0, be non-empty and follow each other without gaps or overlaps (unused positions
+    are declared as FILLER fields), and names must be unique.
+    """
+    label = f"MIS layout {code}" if code else "MIS layout"
+    if not fields:
+        raise ValueError(f"{label} has no fields")
+
+    names = [name.upper() for name, _, _ in fields]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"{label} repeats field names: {', '.join(duplicates)}")
+
+    position = 0
+    for name, start, end in fields:
+        if end <= start:
+            raise ValueError(f"{label}: {name} ends at {end}, not after its start {start}")
+        if start < position:
+            raise ValueError(f"{label}: {name} starts at {start}, overlapping the previous field (ends at {position})")
+        if start > position:
+            raise ValueError(f"{label}: gap at positions {position}-{start} before {name}; declare it as a FILLER field")
+        position = end
+
+    return CompiledLayout(
+        code=code,
+        names=names,
+        starts=[start for _, start, _ in fields],
+        ends=[end for _, _, end in fields],
+        widths=[end - start for _, start, end in fields],
+        width=position,
+        required=[name for name in names if not is_filler(name)],
+        fillers=[name for name in names if is_filler(name)],
+        version=hashlib.sha1(repr([(name.upper(), start, end) for name, start, end in fields]).encode()).hexdigest()[:12],
+    )
+
+# Every layout above, validated at import so a typo in an offset fails immediately
+COMPILED_LAYOUTS = {code: compile_layout(fields, code) for code, fields in LAYOUTS.items()}
+
+_compiled_by_fields = {tuple(fields): layout for fields, layout in zip(LAYOUTS.values(), COMPILED_LAYOUTS.values())}
+
+def get_layout(layout):
+    """
+    Returns the CompiledLayout for a file code, a list of (name, start, end) fields (compiled and
+    cached the first time it is seen) or an already compiled layout.
+    """
+    if isinstance(layout, CompiledLayout):
+        return layout
+    if isinstance(layout, str):
+        return COMPILED_LAYOUTS[layout.upper()]
+    key = tuple(tuple(field) for field in layout)
+    compiled = _compiled_by_fields.get(key)
+    if compiled is None:
+        compiled = _compiled_by_fields[key] = compile_layout(layout)
+    return compiled
+
+def column_sizes(layout):
+    """Maximum characters each column of layout holds: the field width, or room for BLANK_FILLER_TEXT."""
+    layout = get_layout(layout)
+    return [
+        max(width, len(BLANK_FILLER_TEXT)) if is_filler(name) else width
+        for name, width in zip(layout.names, layout.widths)
+    ]
+
+def column_types(layout):
+    """{column: sql_type} for a table holding layout's fields, each VARCHAR2 sized to its field in characters."""
+    layout = get_layout(layout)
+    return {name: f'VARCHAR2({size} CHAR)' for name, size in zip(layout.names, column_sizes(layout))}
+
+def column_ddl(layout):
+    return ', '.join(f'{name} {sql_type}' for name, sql_type in column_types(layout).items())
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from config import PROJECT_PATH as BASE_PATH
+from libs import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+# Local record of what was last loaded into each target (table, or table:term/ACYR slice) of each
+# database and user
+FINGERPRINT_FILE = BASE_PATH / "libs" / "load_fingerprints.json"
+
+# Set to True to reload files even when their content was already loaded into the same target
+# (the GUI's "Force reload" box and batch_runner's --force set it for one run)
+FORCE_RELOAD = False
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+_lock = threading.Lock()
+_skipped = []
+
+def _read_store():
+    try:
+        with open(FINGERPRINT_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Ignoring unreadable fingerprint store {FINGERPRINT_FILE}: {e}")
+        return {}
+
+def _write_store(store):
+    temp_path = FINGERPRINT_FILE.with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(store, f, indent=2, sort_keys=True)
+    os.replace(temp_path, FINGERPRINT_FILE)
+
+def database_identity(conn):
+    # Fingerprints are kept per user and DSN, so the same file loaded elsewhere is never skipped
+    return f"{(conn.username or '').upper()}@{conn.dsn}"
+
+def _store_key(database, target):
+    return f"{database}/{target}" if database else target
+
+def _loaded_data_missing(cursor, target, rows, where=None):
+    """
+    Returns why target no longer holds the rows recorded for it, or None if it still does.
+    target is SCHEMA.TABLE, optionally followed by ':<slice>'; where=(column, value) limits the
+    row count to that slice (the term or ACYR a load replaces).
+    """
+    schema, table_name = target.split(":", 1)[0].split(".", 1)
+    if not catalog_cache.table_exists(cursor, schema, table_name):
+        return f"{schema}.{table_name} no longer exists"
+    if rows is None:
+        return None
+    sql = f'SELECT COUNT(*) FROM {schema}.{table_name.upper()}'
+    params = []
+    if where:
+        sql += f' WHERE {where[0]} = :1'
+        params = [where[1]]
+    cursor.execute(sql, params)
+    (count,) = cursor.fetchone()
+    if count != rows:
+        return f"{target} holds {count} rows instead of the {rows} loaded"
+    return None
+
+def file_fingerprint(file_path, previous=None):
+    """
+    Returns {"file", "size", "mtime_ns", "sha256"} for file_path. When previous describes the same
+    path with the same size and mtime its hash is reused instead of re-reading the file.
+    """
+    resolved = str(Path(file_path).resolve())
+    stat = os.stat(resolved)
+    fingerprint = {"file": resolved, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if previous and all(previous.get(key) == fingerprint[key] for key in ("file", "size", "mtime_ns")):
+        fingerprint["sha256"] = previous["sha256"]
+        return fingerprint
+
+    digest = hashlib.sha256()
+    with open(resolved, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    fingerprint["sha256"] = digest.hexdigest()
+    return fingerprint
+
+def check_unchanged(file_path, target, cursor, source=None, force=None, where=None):
+    """
+    Returns (unchanged, fingerprint). unchanged is True when the content of file_path (and the
+    sheet given as source) is what was last loaded into target on cursor's database and user,
+    target still holds the rows recorded for that load (counted over where=(column, value) for
+    a term/ACYR slice), and force (default FORCE_RELOAD) is off; such files are added to the
+    skipped report. Pass the fingerprint to record_load once the load is committed.
+    """
+    if force is None:
+        force = FORCE_RELOAD
+    database = database_identity(cursor.connection)
+    with _lock:
+        previous = _read_store().get(_store_key(database, target))
+
+    fingerprint = file_fingerprint(file_path, previous)
+    fingerprint.update(source=source, database=database)
+    unchanged = (
+        previous is not None
+        and previous.get("sha256") == fingerprint["sha256"]
+        and previous.get("source") == source
+    )
+    if not unchanged or force:
+        return False, fingerprint
+
+    name = os.path.basename(file_path) + (f" [{source}]" if source else "")
+    missing = _loaded_data_missing(cursor, target, previous.get("rows"), where)
+    if missing:
+        logger.info(f"🔁 Reloading {name} although it is unchanged: {missing}")
+        return False, fingerprint
+
+    note_skipped(file_path, target, previous.get("rows"), "unchanged", source=source, database=database)
+    logger.info(f"⏭️ Skipping {name}: unchanged since it was loaded into {target} on {previous.get('loaded_at')} ({previous.get('rows')} rows)")
+    return True, fingerprint
+
+def previous_load(target, database=None):
+    """
+    Returns what record_load last stored for target on database (see database_identity)
+    ("rows", "seconds", "loaded_at", ...), or None.
+    """
+    with _lock:
+        return _read_store().get(_store_key(database, target))
+
+def note_skipped(file_path, target, rows, reason, source=None, database=None):
+    """
+    Adds a file skipped for reason to the skipped report. rows is what target already holds;
+    the time its last load into database took (if recorded) is reported as time saved.
+    """
+    previous = previous_load(target, database) or {}
+    with _lock:
+        _skipped.append({"file": str(Path(file_path).resolve()), "source": source, "target": target, "reason": reason,
+                         "rows": rows, "seconds": previous.get("seconds"), "loaded_at": previous.get("loaded_at")})
+
+def record_load(target, fingerprint, rows, seconds=None):
+    """
+    Stores fingerprint as the content now loaded into target on the fingerprint's database (the
+    load took seconds), replacing whatever was there.
+    """
+    entry = dict(fingerprint, rows=rows, seconds=seconds, loaded_at=datetime.now().isoformat(timespec="seconds"))
+    try:
+        with _lock:
+            store = _read_store()
+            store[_store_key(fingerprint.get("database"), target)] = entry
+            _write_store(store)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not save load fingerprint for {target}: {e}")
+
+def record_loads(results):
+    """Records every stats dict carrying a "fingerprint" (keyed by its "table") after a commit."""
+    for stats in results:
+        fingerprint = stats.pop("fingerprint", None)
+        if fingerprint is not None:
+            record_load(stats["table"], fingerprint, stats.get("rows"), stats.get("seconds"))
+
+def reset_skipped():
+    with _lock:
+        _skipped.clear()
+
+def skipped_files():
+    with _lock:
+        return list(_skipped)
+
+def log_skipped_summary():
+    skipped = skipped_files()
+    if not skipped:
+        return
+    rows = sum(entry["rows"] or 0 for entry in skipped)
+    timed = [entry["seconds"] for entry in skipped if entry["seconds"] is not None]
+    if len(timed) == len(skipped):
+        saved = f", about {sum(timed):.0f}s of loading saved"
+    elif timed:
+        saved = f", at least {sum(timed):.0f}s of loading saved; load time recorded for {len(timed)} of them"
+    else:
+        saved = ""
+    logger.info(f"⏭️ Skipped {len(skipped)} file(s) already loaded ({rows} rows not reloaded{saved}); force a reload to load them again:")
+    for entry in skipped:
+        loaded = f", loaded {entry['loaded_at']}" if entry["loaded_at"] else ""
+        took = f" in {entry['seconds']:.1f}s" if entry["seconds"] is not None else ""
+        logger.info(f"   {os.path.basename(entry['file'])} → {entry['target']} ({entry['reason']}; {entry['rows']} rows{loaded}{took})")
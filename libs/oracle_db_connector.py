@@ -1,15 +1,13 @@
 import oracledb
 import logging
-import tkinter as tk
-from tkinter import Tk, simpledialog, messagebox
 import threading
 from libs import session
 import queue
 from configparser import ConfigParser
 from config import PROJECT_PATH as BASE_PATH
-
-config = ConfigParser()
-config.read(BASE_PATH / "libs" / "config.ini")
+# Tk-free connections, kept importable from here for the GUI tools; tkinter is only imported by
+# the dialog functions below so headless callers never need it
+from libs.headless_connector import config, get_headless_connection, get_worker_connection
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +15,7 @@ _credentials = {}
 _error_queue = queue.Queue()
 
 def process_queued_errors(root=None):
+    from tkinter import messagebox
     try:
         while not _error_queue.empty():
             title, message = _error_queue.get_nowait()
@@ -28,6 +27,7 @@ def process_queued_errors(root=None):
 
 def show_error_safe(title, message):
     if threading.current_thread() is threading.main_thread():
+        from tkinter import messagebox
         messagebox.showerror(title, message)
     else:
         _error_queue.put((title, message))
@@ -195,6 +195,7 @@ def get_db_connection(force_shared=False, root=None):
                 or not session.dwh_credentials.get("save", False)
             ):
                 if root:
+                    import tkinter as tk
                     result_holder = {}
                     def ask_login():
                         result_holder["creds"] = prompt_credentials(hardcoded_user="dwh", hardcoded_dsn="DWHDB_DB")
@@ -295,4 +296,3 @@ def get_db_connection(force_shared=False, root=None):
                 show_error_safe("Connection Error", f"Failed to connect to Oracle:\n{e}")
             except:
                 pass
-
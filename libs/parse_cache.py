@@ -0,0 +1,233 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from config import PROJECT_PATH as BASE_PATH
+from libs import load_fingerprints
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = ipc = None
+
+# Parsed MIS files are kept here as uncompressed Arrow IPC (Feather v2) files, one record batch per
+# parsed block, keyed by the .dat file's SHA-256 and the layout version. Reads are memory-mapped.
+# Needs pyarrow; without it parsing simply is not cached.
+PARSE_CACHE_ENABLED = True
+CACHE_DIR = BASE_PATH / "MIS" / "parse_cache"
+
+# Least recently used entries are evicted once the cache files exceed this many bytes, and any
+# entry unused for CACHE_MAX_AGE_DAYS is removed
+CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+CACHE_MAX_AGE_DAYS = 30
+
+# A file is only cached on its CACHE_ADMIT_AFTER-th parse with the same layout (1 = its first).
+# Most files are parsed once and then skipped as unchanged, so writing them would only slow that
+# first load down and fill the disk; the ones parsed again (reloads, failed loads) get cached.
+CACHE_ADMIT_AFTER = 2
+
+# Bump when the parser's output for the same file and layout changes, to orphan old entries
+CACHE_FORMAT_VERSION = 1
+
+_INDEX_NAME = "index.json"
+_lock = threading.Lock()
+_warned_unavailable = False
+
+def cache_enabled():
+    global _warned_unavailable
+    if not PARSE_CACHE_ENABLED:
+        return False
+    if pa is None:
+        if not _warned_unavailable:
+            logger.info("ℹ️ pyarrow is not installed; parsed MIS files will not be cached.")
+            _warned_unavailable = True
+        return False
+    return True
+
+def _index_path():
+    return CACHE_DIR / _INDEX_NAME
+
+def _read_index():
+    try:
+        with open(_index_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Ignoring unreadable parse cache index {_index_path()}: {e}")
+        return {}
+
+def _write_index(index):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    temp_path = _index_path().with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(temp_path, _index_path())
+
+def _entry_path(key):
+    return CACHE_DIR / f"{key}.arrow"
+
+def cache_key(file_path, layout, fingerprint=None):
+    """
+    Returns the cache key for file_path parsed with layout (a CompiledLayout), and the file's
+    fingerprint. Pass the fingerprint load_fingerprints already computed for the file to skip
+    hashing it again; otherwise the file is only re-hashed when its size or modification time
+    differs from what the cache last saw.
+    """
+    resolved = str(Path(file_path).resolve())
+    if fingerprint and fingerprint.get("file") == resolved:
+        fingerprint = load_fingerprints.file_fingerprint(file_path, fingerprint)
+    else:
+        with _lock:
+            previous = next((entry for entry in _read_index().values() if entry.get("file") == resolved), None)
+        fingerprint = load_fingerprints.file_fingerprint(file_path, previous)
+    return f"{fingerprint['sha256'][:32]}_{layout.version}_v{CACHE_FORMAT_VERSION}", fingerprint
+
+def lookup(key):
+    """Returns the index entry of key (marking it as just used), or None if it is not cached."""
+    with _lock:
+        index = _read_index()
+        entry = index.get(key)
+        if entry is None or "bytes" not in entry:
+            return None
+        if not _entry_path(key).exists():
+            del index[key]
+            _write_index(index)
+            return None
+        entry["last_used"] = time.time()
+        try:
+            _write_index(index)
+        except OSError as e:
+            logger.debug(f"ℹ️ Could not update parse cache index: {e}")
+    return entry
+
+def admit(key, fingerprint):
+    """
+    Counts a parse of key that missed the cache and returns True if this parse should be written
+    to it (see CACHE_ADMIT_AFTER). Parses not yet admitted are remembered by a small index entry
+    without data.
+    """
+    with _lock:
+        index = _read_index()
+        parses = index.get(key, {}).get("parses", 0) + 1
+        if parses >= CACHE_ADMIT_AFTER:
+            return True
+        index[key] = dict(fingerprint, parses=parses, last_used=time.time())
+        _prune(index, keep=key)
+        try:
+            _write_index(index)
+        except OSError as e:
+            logger.debug(f"ℹ️ Could not update parse cache index: {e}")
+    return False
+
+def iter_cached_blocks(key):
+    """Yields the cached DataFrames of key, reading each record batch from the memory-mapped file."""
+    with pa.memory_map(str(_entry_path(key)), "r") as source:
+        reader = ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i).to_pandas()
+
+def write_through(key, fingerprint, blocks, counts):
+    """
+    Yields blocks unchanged while writing each one to the cache. The entry is only stored once
+    blocks is exhausted, with counts (the parse's record, padded and truncated totals) as they are
+    then; a parse that fails or is abandoned leaves nothing behind.
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    final_path = _entry_path(key)
+    temp_path = final_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    writer = None
+    completed = False
+    try:
+        with pa.OSFile(str(temp_path), "wb") as sink:
+            for block in blocks:
+                batch = pa.RecordBatch.from_pandas(block, preserve_index=False)
+                if writer is None:
+                    writer = ipc.new_file(sink, batch.schema)
+                writer.write_batch(batch)
+                yield block
+            if writer is not None:
+                writer.close()
+            completed = writer is not None
+        if completed:
+            os.replace(temp_path, final_path)
+            _store_entry(key, fingerprint, counts, final_path.stat().st_size)
+    finally:
+        if not completed:
+            try:
+                temp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+def _store_entry(key, fingerprint, counts, size):
+    with _lock:
+        index = _read_index()
+        index[key] = dict(fingerprint, bytes=size, last_used=time.time(), counts=counts)
+        _prune(index, keep=key)
+        _evict(index, keep=key)
+        _write_index(index)
+    logger.info(f"💾 Cached parsed {os.path.basename(fingerprint['file'])} ({size / 1024 / 1024:.1f} MB)")
+
+def _remove(index, key):
+    # Drops key's data and index entry; False if the data is still memory-mapped by a reader (Windows)
+    try:
+        _entry_path(key).unlink(missing_ok=True)
+    except OSError as e:
+        logger.debug(f"ℹ️ Could not evict {key} from the parse cache: {e}")
+        return False
+    index.pop(key, None)
+    return True
+
+def _prune(index, keep):
+    """
+    Removes entries that can no longer be used: older parses of keep's file (its content or
+    layout has changed since), entries unused for CACHE_MAX_AGE_DAYS, and files in CACHE_DIR the
+    index does not know, such as temp files left by a crashed run.
+    """
+    file = index[keep].get("file")
+    cutoff = time.time() - CACHE_MAX_AGE_DAYS * 24 * 3600
+    for key in [key for key in index if key != keep]:
+        entry = index[key]
+        if entry.get("file") == file or entry.get("last_used", 0) < cutoff:
+            if _remove(index, key) and "bytes" in entry:
+                logger.info(f"🗑️ Removed {key} from the parse cache ({'superseded' if entry.get('file') == file else 'unused'})")
+
+    for path in CACHE_DIR.glob("*"):
+        try:
+            stray = path.suffix == ".arrow" and path.stem not in index
+            # Temp files may belong to a parse still being written; only old ones are stray
+            stray = stray or (path.suffix == ".tmp" and path.stat().st_mtime < time.time() - 24 * 3600)
+            if stray:
+                path.unlink()
+        except OSError:
+            pass
+
+def _evict(index, keep=None, max_bytes=None):
+    # Drops least recently used entries until the cache fits max_bytes (default CACHE_MAX_BYTES);
+    # keep is only dropped if it does not fit on its own
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    total = sum(entry.get("bytes", 0) for entry in index.values())
+    for key in sorted(index, key=lambda k: (k == keep, index[k].get("last_used", 0))):
+        if total <= max_bytes:
+            break
+        size = index[key].get("bytes", 0)
+        # Still memory-mapped by a reader (Windows); try again next time
+        if not _remove(index, key):
+            continue
+        total -= size
+        if size:
+            logger.info(f"🗑️ Evicted {key} from the parse cache")
+
+def clear_cache():
+    """Removes every cached parse."""
+    with _lock:
+        index = _read_index()
+        for key in list(index):
+            _remove(index, key)
+        _write_index(index)
@@ -1,20 +1,22 @@
+import hashlib
+import itertools
 import logging
+import os
+import oracledb
+
+from libs import catalog_cache
 
 logger = logging.getLogger(__name__)
 
-def create_index_if_columns_exist(cursor, schema, table_name, columns):
+def create_index_if_columns_exist(cursor, schema, table_name, columns, local=False):
     """
     Creates an index on the specified columns if they exist in the table.
     The index name is auto-generated as <TABLE>_<COL1>_<COL2>_IDX.
     If the index already exists, it skips creation without error.
+    local=True creates it LOCAL (one index partition per table partition) on a partitioned table.
     """
     try:
-        cursor.execute("""
-            SELECT column_name 
-            FROM all_tab_columns 
-            WHERE table_name = :1 AND owner = :2
-        """, [table_name.upper(), schema.upper()])
-        existing_cols = set(row[0] for row in cursor.fetchall())
+        existing_cols = set(catalog_cache.table_columns(cursor, schema, table_name) or ())
 
         index_cols = [col.upper() for col in columns if col.upper() in existing_cols]
         if not index_cols:
@@ -23,6 +25,8 @@ def create_index_if_columns_exist(cursor, schema, table_name, columns):
 
         index_name = f"{table_name.upper()}_" + "_".join(index_cols) + "_IDX"
         index_sql = f'CREATE INDEX {index_name} ON {schema}.{table_name.upper()} ({", ".join(index_cols)})'
+        if local:
+            index_sql += ' LOCAL'
 
         try:
             cursor.execute(index_sql)
@@ -42,3 +46,149 @@ def create_index_if_columns_exist(cursor, schema, table_name, columns):
 
     except Exception as e:
         logger.warning(f"⚠️ Failed index logic on {schema}.{table_name}: {e}")
+
+# Default number of rows bound per executemany() round trip
+DEFAULT_BATCH_SIZE = 5000
+
+# Direct-path bulk mode: tables are created NOLOGGING, rows go in with APPEND_VALUES and
+# indexes/grants are built once the data is in (see finish_bulk_load). Only tables the run
+# creates (or staging tables) are loaded direct-path; existing tables keep conventional inserts.
+BULK_LOAD_MODE = False
+
+def direct_path_sql(insert_sql):
+    return insert_sql.replace("INSERT INTO", "INSERT /*+ APPEND_VALUES */ INTO", 1)
+
+def _insert_batch_direct_path(cursor, conn, insert_sql, batch, input_sizes=None):
+    # APPEND_VALUES does not support batcherrors and locks the table until commit, so every
+    # batch commits on its own; a failing batch is retried conventionally to find the bad rows.
+    try:
+        cursor.executemany(direct_path_sql(insert_sql), batch)
+        conn.commit()
+        return []
+    except oracledb.DatabaseError as e:
+        conn.rollback()
+        logger.debug(f"ℹ️ Direct-path batch failed, retrying conventionally: {e}")
+        if input_sizes:
+            cursor.setinputsizes(*input_sizes)
+        cursor.executemany(insert_sql, batch, batcherrors=True)
+        batch_errors = cursor.getbatcherrors()
+        conn.commit()
+        return batch_errors
+
+def insert_rows_batched(cursor, conn, insert_sql, rows, table_label, batch_size=None, direct_path=False, rejects=None, input_sizes=None):
+    """
+    Inserts rows through cursor.executemany() in chunks of batch_size using batcherrors=True,
+    so one bad row does not fail the whole chunk. abort_manager.should_abort is checked
+    between chunks. rows can be any iterable of tuples (list, generator, df.itertuples()).
+    batch_size defaults to DEFAULT_BATCH_SIZE at call time. With direct_path=True each chunk is a committed APPEND_VALUES insert instead.
+    Failed rows are logged one by one, unless a rejects list is passed to collect
+    (row_number, row, message) tuples instead (row_number is 0-based within rows).
+    input_sizes (one maximum string length per column) sizes the bind buffers up front instead of
+    from the longest value of each batch.
+    Returns (success_count, fail_count), or None if the load was aborted.
+    """
+    from itertools import islice
+    from libs import abort_manager
+
+    success_count = 0
+    fail_count = 0
+    row_offset = 0
+    rows = iter(rows)
+    batch_size = max(1, int(batch_size or DEFAULT_BATCH_SIZE))
+
+    # Direct-path batches commit individually, so pending work is settled before the first one
+    settled = not direct_path
+
+    while True:
+        if abort_manager.should_abort:
+            abort_manager.cleanup_on_abort(conn, cursor)
+            return None
+
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        if not settled:
+            conn.commit()
+            settled = True
+
+        if input_sizes:
+            cursor.setinputsizes(*input_sizes)
+        if direct_path:
+            batch_errors = _insert_batch_direct_path(cursor, conn, insert_sql, batch, input_sizes)
+        else:
+            cursor.executemany(insert_sql, batch, batcherrors=True)
+            batch_errors = cursor.getbatcherrors()
+        for error in batch_errors:
+            if rejects is not None:
+                rejects.append((row_offset + error.offset, batch[error.offset], error.message))
+            else:
+                logger.warning(f"❌ Failed to insert row {row_offset + error.offset + 1}: {error.message}")
+
+        fail_count += len(batch_errors)
+        success_count += len(batch) - len(batch_errors)
+        row_offset += len(batch)
+        logger.debug(f"📦 {table_label}: {row_offset} rows sent ({fail_count} failed so far)")
+
+    return success_count, fail_count
+
+def finish_bulk_load(cursor, schema, table_name, index_columns, local_index=False):
+    """
+    Completes a bulk-mode load: builds the deferred indexes (none if index_columns is empty),
+    grants SELECT to PUBLIC and switches the table back to LOGGING now that the data is in.
+    """
+    if index_columns:
+        create_index_if_columns_exist(cursor, schema, table_name, index_columns, local=local_index)
+    cursor.execute(f'GRANT SELECT ON {schema}.{table_name.upper()} TO PUBLIC')
+    cursor.execute(f'ALTER TABLE {schema}.{table_name.upper()} LOGGING')
+    logger.info(f"✅ Bulk load finished for {schema}.{table_name}: indexes built, SELECT granted to PUBLIC, LOGGING restored")
+
+# Tags the staging/old table names of this run so they never match another run's or a user's table
+RUN_ID = os.urandom(2).hex().upper()
+_staging_sequence = itertools.count(1)
+
+def staging_table_name(table_name, suffix="STG"):
+    """
+    Returns a new name for a work table of table_name that no other job or run will use:
+    a short hash of the full name keeps truncated names apart, then the run id and a counter.
+    Kept within Oracle's 30-character limit for pre-12.2 databases; index names built from it
+    would not be, so staging tables get no indexes of their own (see swap_in_staging_table).
+    """
+    name = table_name.upper()
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:6].upper()
+    tail = f"_{digest}_{RUN_ID}{next(_staging_sequence):X}_{suffix}"
+    return f"{name[:30 - len(tail)].rstrip('_')}{tail}"
+
+def swap_in_staging_table(cursor, schema, staging_name, table_name):
+    """
+    Replaces schema.table_name with a fully loaded staging table through two renames, so readers
+    only miss the table for the instant between them. The previous table is moved to a name of
+    this run and dropped afterwards, along with its indexes, so the caller can then index the
+    swapped-in table under the target's own index names. If the swap fails the previous table
+    is put back.
+    """
+    target = table_name.upper()
+    staging = staging_name.upper()
+    old = staging_table_name(target, "OLD")
+
+    existing = {target} if catalog_cache.table_exists(cursor, schema, target) else set()
+
+    if target in existing:
+        cursor.execute(f'ALTER TABLE {schema}.{target} RENAME TO {old}')
+        catalog_cache.note_table_renamed(schema, target, old)
+    try:
+        cursor.execute(f'ALTER TABLE {schema}.{staging} RENAME TO {target}')
+        catalog_cache.note_table_renamed(schema, staging, target)
+    except Exception:
+        if target in existing:
+            cursor.execute(f'ALTER TABLE {schema}.{old} RENAME TO {target}')
+            catalog_cache.note_table_renamed(schema, old, target)
+        raise
+    logger.info(f"🔀 Swapped staging table {schema}.{staging} in as {schema}.{target}")
+
+    if target in existing:
+        try:
+            cursor.execute(f'DROP TABLE {schema}.{old} PURGE')
+            catalog_cache.note_table_dropped(schema, old)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not drop previous table {schema}.{old}: {e}")
+
@@ -1,11 +1,17 @@
 import os
+import numpy as np
 import pandas as pd
 import oracledb
 import logging
-from tkinter import Tk, filedialog, simpledialog, Toplevel, Label, Checkbutton, IntVar, Button, Entry
 import sys
 from pathlib import Path
-from libs.table_utils import create_index_if_columns_exist
+from itertools import chain, islice
+import openpyxl
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from libs import catalog_cache, load_fingerprints, table_utils
+from libs.table_utils import create_index_if_columns_exist, insert_rows_batched, finish_bulk_load, staging_table_name, swap_in_staging_table
+from libs.column_profiler import profile_columns, build_columns_ddl, fit_chunk_to_table, record_date_formats
 
 # Add path to shared connector
 from config import PROJECT_PATH as base_path
@@ -13,6 +19,7 @@ from config import PROJECT_PATH as base_path
 # Logging setup
 logger = logging.getLogger(__name__)
 
+from libs.headless_connector import get_worker_connection
 from libs.oracle_db_connector import get_db_connection
 from libs import abort_manager
 
@@ -25,6 +32,8 @@ def center_window(window, width, height):
     window.geometry(f"{width}x{height}+{x}+{y}")
 
 def prompt_schema_choice():
+    from tkinter import Toplevel, Label, Button, Frame
+
     result = {"choice": None}
 
     def select_user():
@@ -46,8 +55,6 @@ def prompt_schema_choice():
 
     Label(win, text="Load to which schema?", font=("Arial", 11, "bold")).pack(pady=(15, 10))
 
-    from tkinter import Frame  # Ensure Frame is imported
-
     btn_frame = Frame(win)
     btn_frame.pack(pady=5)
 
@@ -69,64 +76,281 @@ def prompt_schema_choice():
 
     return result["choice"]
 
+# Rows read per chunk when streaming CSV files (None reads the whole file at once)
+CSV_CHUNK_SIZE = 50000
+
+# Rows per DataFrame chunk when streaming worksheets from a read-only workbook
+EXCEL_CHUNK_SIZE = 50000
+
+# Files loaded at once, each worker on its own connection (1 = one file after another)
+LOAD_WORKERS = 1
+
+# Load into a staging table of this run and rename it over the target at the end, so the existing table stays
+# readable (and untouched if the load fails) instead of being dropped up front
+STAGING_SWAP_MODE = False
+
 # ==== CLEAN COLUMN NAMES TO BE ORACLE-COMPATIBLE ====
 def clean_column_names(df):
     df.columns = [col.strip().replace(' ', '_').replace('-', '_').replace('.', '_').upper() for col in df.columns]
     return df
 
+# ==== DROP BLANK ROWS ====
+def drop_blank_rows(df):
+    """
+    Drops rows where every cell is '' or whitespace, one column at a time instead of a
+    Python call per row. Only rows not already known to hold data are checked per column.
+    Expects string cells (dtype=str, na_filter=False).
+    """
+    if df.empty:
+        return df
+
+    keep = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        values = df[col]
+        candidates = values.ne('').to_numpy() & ~keep
+        if candidates.any():
+            keep[candidates] = ~values[candidates].str.isspace().to_numpy(dtype=bool)
+        if keep.all():
+            return df
+    return df.loc[keep]
+
 # ==== DROP TABLE IF EXISTS ====
 def drop_table_if_exists(cursor, schema, table_name):
     try:
-        cursor.execute("""
-            SELECT table_name FROM all_tables 
-            WHERE table_name = :1 AND owner = :2
-        """, [table_name.upper(), schema])
-        if cursor.fetchone():
+        if catalog_cache.table_exists(cursor, schema, table_name):
             cursor.execute(f'DROP TABLE {schema}.{table_name.upper()} PURGE')
+            catalog_cache.note_table_dropped(schema, table_name)
             logger.info(f"🗑️ Dropped existing table {schema}.{table_name}")
     except Exception as e:
         logger.warning(f"⚠️ Could not drop table {table_name}: {e}")
 
 # ==== CREATE TABLE ====
-def create_table(cursor, schema, table_name, df):
-    cols_sql = ', '.join([
-        f'"{col}" VARCHAR2(9)' if col.upper() in ['PIDM', 'STUDENT_ID'] else
-        f'"{col}" VARCHAR2(6)' if col.upper() == 'TERM' else
-        f'"{col}" VARCHAR2(4000)'
-        for col in df.columns
-    ])
+# Columns that always keep these types so they can be indexed and joined as text
+FIXED_COLUMN_TYPES = {'PIDM': 'VARCHAR2(9)', 'STUDENT_ID': 'VARCHAR2(9)', 'TERM': 'VARCHAR2(6)'}
+
+# Indexed (as one index) whenever the table has any of them
+INDEX_COLUMNS = ["PIDM", "TERM", "STUDENT_ID"]
+
+def create_table(cursor, schema, table_name, df, infer_types=None, bulk=False, index=True):
+    """
+    Creates schema.table_name with column types profiled from df (see libs.column_profiler).
+    In bulk mode the table is created NOLOGGING and the grant/index are left to finish_bulk_load.
+    index=False leaves the index to the caller (staging tables get theirs once swapped in).
+    Returns the {column: sql_type} map used, to be passed on to fit_chunk_to_table.
+    """
+    column_types = profile_columns(df, FIXED_COLUMN_TYPES, infer_types)
+    cols_sql = build_columns_ddl(column_types)
+    if bulk:
+        cursor.execute(f'CREATE TABLE {schema}.{table_name.upper()} ({cols_sql}) NOLOGGING')
+        catalog_cache.note_table_created(schema, table_name, column_types)
+        record_date_formats(cursor, schema, table_name, df, column_types)
+        abort_manager.register_created_table(table_name)
+        logger.info(f"✅ Created table NOLOGGING for bulk load (grant and index deferred): {schema}.{table_name}")
+        return column_types
+
     cursor.execute(f'CREATE TABLE {schema}.{table_name.upper()} ({cols_sql})')
+    catalog_cache.note_table_created(schema, table_name, column_types)
+    record_date_formats(cursor, schema, table_name, df, column_types)
     cursor.execute(f'GRANT SELECT ON {schema}.{table_name.upper()} TO PUBLIC')
     abort_manager.register_created_table(table_name)
     logger.info(f"✅ Created table and granted SELECT to PUBLIC: {schema}.{table_name}")
     
     # ==== CREATE INDEX IF COLUMNS EXIST ====
-    create_index_if_columns_exist(cursor, schema, table_name, ["PIDM", "TERM", "STUDENT_ID"])
+    if index:
+        create_index_if_columns_exist(cursor, schema, table_name, INDEX_COLUMNS)
+    return column_types
 
 # ==== INSERT DATA ====
-def insert_data(cursor, schema, table_name, df, conn):
-    columns = ', '.join([f'"{col}"' for col in df.columns])
-    values = ', '.join([f':{i+1}' for i in range(len(df.columns))])
-    insert_sql = f'INSERT INTO {schema}.{table_name.upper()} ({columns}) VALUES ({values})'
+def build_insert_sql(schema, table_name, columns):
+    column_list = ', '.join([f'"{col}"' for col in columns])
+    values = ', '.join([f':{i+1}' for i in range(len(columns))])
+    return f'INSERT INTO {schema}.{table_name.upper()} ({column_list}) VALUES ({values})'
+
+# ==== STREAMING TABLE LOAD ====
+def load_chunks(cursor, conn, schema, table_name, chunks, source_name, batch_size=None, bulk=None, staging=None):
+    """
+    Loads an iterator of DataFrames into schema.table_name holding one chunk in memory at a time.
+    The first chunk must carry the cleaned column names and is used to build the table DDL;
+    later chunks are renamed to match. bulk (default table_utils.BULK_LOAD_MODE) loads
+    direct-path into a NOLOGGING table and builds the index and grant afterwards.
+    staging (default STAGING_SWAP_MODE) loads a staging table and swaps it in once complete; its
+    index is built on the target after the swap, so the index gets the target's name.
+    Returns {"table", "rows", "failed", "seconds"} for the load summary, or None if it was aborted.
+    """
+    started = time.perf_counter()
+    batch_size = batch_size or table_utils.DEFAULT_BATCH_SIZE
+    if bulk is None:
+        bulk = table_utils.BULK_LOAD_MODE
+    if staging is None:
+        staging = STAGING_SWAP_MODE
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        logger.warning(f"⚠️ No data found in {source_name}. Skipping.")
+        return {"table": f"{schema}.{table_name}", "rows": 0, "failed": 0, "seconds": 0.0}
+
+    columns = list(first_chunk.columns)
+    first_chunk = drop_blank_rows(first_chunk)
+
+    # A staging name is new to this run, so only the target itself is ever dropped up front
+    if staging:
+        load_table = staging_table_name(table_name)
+    else:
+        load_table = table_name
+        drop_table_if_exists(cursor, schema, load_table)
+    column_types = create_table(cursor, schema, load_table, first_chunk, bulk=bulk, index=not staging)
+    insert_sql = build_insert_sql(schema, load_table, columns)
+
+    logger.info(f"📊 Streaming {source_name} into {schema}.{load_table} (batch size {batch_size}{', direct-path' if bulk else ''})")
 
-    logger.info(f"📊 Preparing to insert {len(df)} rows into {schema}.{table_name}")
+    try:
+        stats = _insert_chunks(cursor, conn, schema, load_table, first_chunk, chunks, columns, column_types, insert_sql, batch_size, bulk,
+                               index_columns=() if staging else INDEX_COLUMNS)
+        if stats is None:
+            return None
+        if staging:
+            conn.commit()
+            swap_in_staging_table(cursor, schema, load_table, table_name)
+    except Exception:
+        if staging:
+            # The live table was never touched; just discard the partial staging table
+            drop_table_if_exists(cursor, schema, load_table)
+        raise
+    if staging:
+        create_index_if_columns_exist(cursor, schema, table_name, INDEX_COLUMNS)
+
+    logger.info(f"✅ Inserted {stats[0]} rows into {schema}.{table_name} ({stats[1]} failed)")
+    return {
+        "table": f"{schema}.{table_name}",
+        "rows": stats[0],
+        "failed": stats[1],
+        "seconds": time.perf_counter() - started,
+    }
+
+def _insert_chunks(cursor, conn, schema, table_name, first_chunk, chunks, columns, column_types, insert_sql, batch_size, bulk, index_columns=INDEX_COLUMNS):
+    # Returns (success_count, fail_count) for every chunk, or None if the load was aborted
 
     success_count = 0
     fail_count = 0
+    for chunk_number, chunk in enumerate(chain([first_chunk], chunks), start=1):
+        if chunk_number > 1:
+            chunk.columns = columns
+            chunk = drop_blank_rows(chunk)
+        # The first chunk is the profiling sample; later chunks may widen or retype columns
+        chunk = fit_chunk_to_table(cursor, schema, table_name, chunk, column_types, FIXED_COLUMN_TYPES)
+        result = insert_rows_batched(
+            cursor, conn, insert_sql, chunk.itertuples(index=False, name=None),
+            f"{schema}.{table_name}", batch_size=batch_size, direct_path=bulk
+        )
+        if result is None:
+            return None
+        success_count += result[0]
+        fail_count += result[1]
+        logger.debug(f"📦 Chunk {chunk_number}: {success_count + fail_count} rows processed for {schema}.{table_name}")
+
+    if bulk:
+        finish_bulk_load(cursor, schema, table_name, index_columns)
+    return success_count, fail_count
+
+# ==== STREAMING CSV READER ====
+def read_csv_chunks(file_path, file_prefix, chunk_size=CSV_CHUNK_SIZE):
+    """
+    Yields the CSV as DataFrames of at most chunk_size rows (the whole file when chunk_size is None).
+    Every cell is read as a string with blanks kept as '' so chunks never need a second
+    astype(str)/fillna copy and their dtypes cannot drift from one chunk to the next.
+    Column names are cleaned on the first chunk.
+    """
+    def clean_first(chunk):
+        chunk = clean_column_names(chunk)
+        # Strip file prefix from column names if accidentally included
+        chunk.columns = [col.replace(f"{file_prefix}_", "") for col in chunk.columns]
+        return chunk
+
+    if not chunk_size:
+        yield clean_first(pd.read_csv(file_path, dtype=str, na_filter=False))
+        return
 
-    for i, row in df.iterrows():
-        if abort_manager.should_abort:
-            abort_manager.cleanup_on_abort(conn, cursor)
-            return False
-        try:
-            cursor.execute(insert_sql, tuple(row))
-            success_count += 1
-        except Exception as e:
-            logger.warning(f"❌ Failed to insert row {i+1}: {e}")
-            fail_count += 1
+    with pd.read_csv(file_path, dtype=str, na_filter=False, chunksize=chunk_size) as reader:
+        for chunk_number, chunk in enumerate(reader):
+            yield clean_first(chunk) if chunk_number == 0 else chunk
+
+def load_csv_file(cursor, conn, schema, table_name, file_path, file_prefix, chunk_size=CSV_CHUNK_SIZE, batch_size=None):
+    """
+    Streams a CSV into schema.table_name one chunk at a time, so peak memory is bounded by
+    chunk_size rather than the file size. Returns the load_chunks stats, or None if aborted.
+    """
+    chunks = read_csv_chunks(file_path, file_prefix, chunk_size)
+    return load_chunks(cursor, conn, schema, table_name, chunks, os.path.basename(file_path), batch_size)
+
+# ==== STREAMING EXCEL READER ====
+def _excel_cell_to_str(value):
+    # Matches pd.read_excel(dtype=str, na_filter=False): blanks -> '', whole floats -> ints
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def _excel_header(header_row):
+    # Same naming as pandas: blank headers become 'Unnamed: n' and duplicates get .1, .2 ...
+    columns = []
+    seen = {}
+    for i, value in enumerate(header_row):
+        name = _excel_cell_to_str(value) or f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+def _sheet_width(worksheet, header_width):
+    # Like pd.read_excel, data past the last header keeps its columns (as 'Unnamed: n'); the
+    # sheet is only scanned for them when its dimensions reach past the header or are unknown
+    if worksheet.max_column is not None and worksheet.max_column <= header_width:
+        return header_width
+    width = header_width
+    for row in worksheet.iter_rows(min_row=2, values_only=True):
+        for i in range(len(row) - 1, width - 1, -1):
+            if row[i] not in (None, ''):
+                width = i + 1
+                break
+    return width
+
+def read_excel_sheet_chunks(worksheet, chunk_size=EXCEL_CHUNK_SIZE):
+    """
+    Yields a read-only openpyxl worksheet as string DataFrames of at most chunk_size rows,
+    so no full DataFrame is built per sheet. The first row is the header; column names are
+    cleaned on the first chunk.
+    """
+    rows = worksheet.iter_rows(values_only=True)
+    header_row = next(rows, None)
+    if header_row is None:
+        return
 
-    logger.info(f"✅ Inserted {success_count} rows into {schema}.{table_name} ({fail_count} failed)")
-    return True
+    header_row = list(header_row)
+    while header_row and header_row[-1] is None:
+        header_row.pop()
+    width = _sheet_width(worksheet, len(header_row))
+    columns = _excel_header(header_row + [None] * (width - len(header_row)))
+
+    chunk_number = 0
+    while True:
+        batch = [
+            [_excel_cell_to_str(value) for value in row[:width]] + [''] * (width - len(row))
+            for row in islice(rows, chunk_size)
+        ]
+        if not batch and chunk_number > 0:
+            return
+        chunk = pd.DataFrame(batch, columns=columns, dtype=object)
+        yield clean_column_names(chunk) if chunk_number == 0 else chunk
+        chunk_number += 1
+        if len(batch) < chunk_size:
+            return
+
+def read_xls_sheet_chunks(excel_file, sheet):
+    # Legacy .xls workbooks are not supported by openpyxl; parse the sheet in one pass instead
+    yield clean_column_names(excel_file.parse(sheet, dtype=str, na_filter=False))
 
 # ==== SHEET SELECTOR DIALOG ====
 def select_sheets_gui(file, sheets):
@@ -203,8 +427,176 @@ def select_sheets_gui(file, sheets):
     top.wait_window()
     return result if result else None
 
+# ==== LOAD PLANNING ====
+def plan_file_jobs(file_paths):
+    """
+    Asks for every table-name decision up front so the loads themselves need no dialogs.
+    Returns one job per file: {"file_path", "file_prefix", "workbook", "tables": [(sheet, table_name)]}
+    (sheet is None for CSV), or None if the user cancelled. Workbooks stay open in the job so
+    they are only parsed once; run_file_job closes them.
+    """
+    from tkinter.simpledialog import askstring
+
+    jobs = []
+    try:
+        for file_path in file_paths:
+            file_name = os.path.splitext(os.path.basename(file_path))[0].replace('-', '_').replace(' ', '_').upper()
+
+            if file_path.endswith('.csv'):
+                table_name = file_name
+                override = askstring("Rename Table", f"Default table name is '{table_name}'. Enter a new name or leave blank:")
+                if override and override.strip():
+                    table_name = override.strip().replace('-', '_').replace(' ', '_').upper()
+                jobs.append({"file_path": file_path, "file_prefix": file_name, "workbook": None, "tables": [(None, table_name)]})
+                continue
+
+            try:
+                # Open the workbook once; every selected sheet streams from the same handle
+                if file_path.lower().endswith('.xls'):
+                    workbook = pd.ExcelFile(file_path)
+                    all_sheets = workbook.sheet_names
+                else:
+                    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+                    all_sheets = workbook.sheetnames
+            except Exception as e:
+                logger.error(f"❌ Failed to load Excel {file_path}: {e}")
+                continue
+
+            job = {"file_path": file_path, "file_prefix": file_name, "workbook": workbook, "tables": []}
+            jobs.append(job)
+
+            sheet_map = select_sheets_gui(file_path, all_sheets)
+            if not sheet_map:
+                logger.warning("❌ User cancelled sheet selection.")
+                close_file_jobs(jobs)
+                return None
+            job["tables"] = list(sheet_map.items())
+    except Exception:
+        close_file_jobs(jobs)
+        raise
+
+    return jobs
+
+def close_file_jobs(jobs):
+    for job in jobs:
+        if job["workbook"] is not None:
+            try:
+                job["workbook"].close()
+            except Exception:
+                pass
+            job["workbook"] = None
+
+# ==== LOAD ONE FILE ====
+def run_file_job(cursor, conn, schema, job):
+    """
+    Loads every table of one planned file job. Errors are logged per file like before.
+    Tables whose source content is already loaded (see libs.load_fingerprints) are skipped.
+    Returns the list of per-table stats, each carrying the "fingerprint" to record after commit,
+    or None if the load was aborted.
+    """
+    file_path = job["file_path"]
+    results = []
+    try:
+        if job["workbook"] is None:
+            try:
+                table_name = job["tables"][0][1]
+                unchanged, fingerprint = load_fingerprints.check_unchanged(file_path, f"{schema}.{table_name}", cursor)
+                if unchanged:
+                    return results
+                stats = load_csv_file(cursor, conn, schema, table_name, file_path, job["file_prefix"])
+                if stats is None:
+                    return None
+                stats["fingerprint"] = fingerprint
+                results.append(stats)
+                logger.info(f"🚀 Loaded CSV: {stats['table']}")
+            except Exception as e:
+                logger.error(f"❌ Failed to load CSV {file_path}: {e}")
+            return results
+
+        workbook = job["workbook"]
+        try:
+            for sheet, table_name in job["tables"]:
+                unchanged, fingerprint = load_fingerprints.check_unchanged(file_path, f"{schema}.{table_name}", cursor, source=sheet)
+                if unchanged:
+                    continue
+                if isinstance(workbook, pd.ExcelFile):
+                    chunks = read_xls_sheet_chunks(workbook, sheet)
+                else:
+                    chunks = read_excel_sheet_chunks(workbook[sheet])
+                stats = load_chunks(cursor, conn, schema, table_name, chunks, f"{os.path.basename(file_path)} [{sheet}]")
+                if stats is None:
+                    return None
+                stats["fingerprint"] = fingerprint
+                results.append(stats)
+                logger.info(f"🚀 Loaded Excel: {schema}.{table_name}")
+        except Exception as e:
+            logger.error(f"❌ Failed to load Excel {file_path}: {e}")
+        return results
+    finally:
+        close_file_jobs([job])
+
+# ==== PARALLEL LOAD ====
+def _run_file_job_worker(schema, job, force_shared):
+    # Each worker owns its connection and transaction: commit on success, rollback/drop on abort
+    if abort_manager.should_abort:
+        close_file_jobs([job])
+        return []
+
+    conn = get_worker_connection(force_shared=force_shared)
+    if not conn:
+        logger.error(f"❌ Worker could not connect to Oracle for {os.path.basename(job['file_path'])}.")
+        close_file_jobs([job])
+        return []
+
+    cursor = conn.cursor()
+    try:
+        results = run_file_job(cursor, conn, schema, job)
+        if results is None:
+            return []  # cleanup_on_abort already rolled back, dropped and closed
+        conn.commit()
+        load_fingerprints.record_loads(results)
+        return results
+    except Exception as e:
+        logger.error(f"❌ Worker failed on {job['file_path']}: {e}")
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return []
+    finally:
+        abort_manager.release_created_tables()
+        try:
+            cursor.close()
+            conn.close()
+        except Exception:
+            pass
+
+def load_file_jobs_parallel(schema, jobs, force_shared, workers):
+    """
+    Runs planned file jobs on a thread pool of `workers`, one Oracle connection per worker.
+    Returns the per-table stats of every job that finished.
+    """
+    logger.info(f"🧵 Loading {len(jobs)} files with {workers} parallel workers")
+    results = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="excel_csv_loader") as pool:
+        futures = [pool.submit(_run_file_job_worker, schema, job, force_shared) for job in jobs]
+        for future in as_completed(futures):
+            results.extend(future.result())
+    return results
+
+def log_load_summary(results):
+    for stats in results:
+        rate = stats["rows"] / stats["seconds"] if stats["seconds"] else 0
+        logger.info(f"⏱️ {stats['table']}: {stats['rows']} rows ({stats['failed']} failed) in {stats['seconds']:.1f}s — {rate:,.0f} rows/sec")
+
 # ==== MAIN FUNCTION ====
-def load_multiple_files():
+def load_multiple_files(workers=None):
+    """
+    GUI entry point. workers > 1 loads the selected files in parallel (see LOAD_WORKERS);
+    otherwise files load one after another on a single connection and commit together.
+    """
+    from tkinter import Tk, filedialog
+
     root = Tk()
     root.withdraw()
 
@@ -212,7 +604,8 @@ def load_multiple_files():
     if schema_choice is None:
         return
 
-    conn = get_db_connection(force_shared=(schema_choice == "dwh"))
+    force_shared = schema_choice == "dwh"
+    conn = get_db_connection(force_shared=force_shared)
     if not conn:
         logger.error("❌ Failed to connect to Oracle.")
         return
@@ -227,64 +620,34 @@ def load_multiple_files():
     
     cursor = conn.cursor()
     abort_manager.reset()
+    load_fingerprints.reset_skipped()
+    catalog_cache.reset()
+    workers = workers or LOAD_WORKERS
 
     try:
-        for file_path in file_paths:
-            file_name = os.path.splitext(os.path.basename(file_path))[0].replace('-', '_').replace(' ', '_').upper()
-
-            if file_path.endswith('.csv'):
-                try:
-                    df = pd.read_csv(file_path)
-                    df = clean_column_names(df)
-                    # Strip file prefix from column names if accidentally included
-                    file_prefix = file_name
-                    df.columns = [col.replace(f"{file_prefix}_", "") for col in df.columns]
-                    df = df.astype(str).fillna('')
-                    table_name = file_name
-                    from tkinter.simpledialog import askstring
-                    override = askstring("Rename Table", f"Default table name is '{table_name}'. Enter a new name or leave blank:")
-                    if override and override.strip():
-                        table_name = override.strip().replace('-', '_').replace(' ', '_').upper()                    
-                    drop_table_if_exists(cursor, schema, table_name)
-                    create_table(cursor, schema, table_name, df)
-                    success = insert_data(cursor, schema, table_name, df, conn)
-                    if not success:
-                        return
-                    logger.info(f"🚀 Loaded CSV: {schema}.{table_name}")
-                except Exception as e:
-                    logger.error(f"❌ Failed to load CSV {file_path}: {e}")
-            else:
-                try:
-                    all_sheets = pd.ExcelFile(file_path).sheet_names
-
-                    if len(all_sheets) > 1:
-                        sheet_map = select_sheets_gui(file_path, all_sheets)
-                        if not sheet_map:
-                            logger.warning("❌ User cancelled sheet selection.")
-                            return
-                    else:
-                        sheet_name = all_sheets[0]
-                        sheet_map = select_sheets_gui(file_path, [sheet_name])
-                        if not sheet_map:
-                            logger.warning("❌ User cancelled sheet selection.")
-                            return
-
-                    for sheet, table_name in sheet_map.items():
-                        df = pd.read_excel(file_path, sheet_name=sheet, dtype=str, na_filter=False)
-                        df = df.loc[df.apply(lambda row: any(str(cell).strip() for cell in row), axis=1)]
-                        df = clean_column_names(df)
-
-                        drop_table_if_exists(cursor, schema, table_name)
-                        create_table(cursor, schema, table_name, df)
-                        success = insert_data(cursor, schema, table_name, df, conn)
-                        if not success:
-                            return
-                        logger.info(f"🚀 Loaded Excel: {schema}.{table_name}")
-                except Exception as e:
-                    logger.error(f"❌ Failed to load Excel {file_path}: {e}")
+        jobs = plan_file_jobs(file_paths)
+        if jobs is None:
+            return
+
+        if workers > 1 and len(jobs) > 1:
+            results = load_file_jobs_parallel(schema, jobs, force_shared, workers)
+        else:
+            results = []
+            for i, job in enumerate(jobs):
+                job_results = run_file_job(cursor, conn, schema, job)
+                if job_results is None:
+                    close_file_jobs(jobs[i + 1:])
+                    return
+                results.extend(job_results)
+            conn.commit()
+            load_fingerprints.record_loads(results)
 
-        conn.commit()
-        logger.info("✅ All files processed successfully.")
+        if abort_manager.should_abort:
+            logger.warning("⏹️ Excel/CSV Loader aborted by user.")
+        else:
+            log_load_summary(results)
+            load_fingerprints.log_skipped_summary()
+            logger.info("✅ All files processed successfully.")
 
     except Exception as e:
         logger.error(f"❌ Unexpected error during file processing: {e}")
@@ -1,7 +1,15 @@
+import mmap
 import os
+import numpy as np
 import pandas as pd
+import queue
+import re
 import sys
+import threading
 import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 
 # Ensure the project root is in sys.path
@@ -14,114 +22,465 @@ from config import PROJECT_PATH as BASE_PATH
 from config import PROJECT_PATH as base_path
 from libs import abort_manager
 from libs.oracle_db_connector import get_db_connection
-from libs.layout_definitions import LAYOUTS
-from libs.table_utils import create_index_if_columns_exist
+from libs.layout_definitions import LAYOUTS, column_ddl, column_sizes, column_types, get_layout
+from libs import catalog_cache, load_fingerprints, parse_cache, table_utils
+from libs.table_utils import create_index_if_columns_exist, insert_rows_batched, finish_bulk_load, staging_table_name
 import logging
 
 # Directory where the MIS .dat files are placed
 MIS_FOLDER = Path(__file__).resolve().parent.parent / "MIS"
 
+# Rows that fail validation or insert are written here as <TABLE>_<term>_rejects.csv
+REJECT_FOLDER = MIS_FOLDER / "rejects"
+
+# Parse the next files on a background thread while the current one is inserted; the queue
+# holds at most PIPELINE_QUEUE_BLOCKS parsed blocks (PARSE_BLOCK_LINES records each)
+PIPELINE_MODE = False
+PIPELINE_QUEUE_BLOCKS = 4
+
+_END = object()
+
+# Create new MIS tables list-partitioned by GI03_TERM_ID, one partition per term. A term of a
+# partitioned table is replaced without a DELETE, using PARTITION_RELOAD_METHOD: "exchange" loads
+# a staging table and swaps it in with EXCHANGE PARTITION, "truncate" truncates the term's
+# partition and inserts direct-path. Either way the cost follows the term, not the table size.
+# Only "exchange" is atomic: it keeps the old rows visible, and intact if the load fails, until the
+# swap. TRUNCATE PARTITION is DDL and commits at once, so with "truncate" the term is empty from
+# the start of the load and stays partly loaded if the load fails.
+PARTITION_BY_TERM = False
+PARTITION_RELOAD_METHOD = "exchange"
+
 logger = logging.getLogger(__name__)
 
-def parse_fixed_width_file(file_path, layout, file_code=None):
+# Parse and validation diagnostics (short/long lines, rejected rows) are summarised once per file
+# on this channel, as counts plus up to DIAGNOSTIC_SAMPLES example records each. Enabling DEBUG
+# on it (trace_diagnostics()) also logs every such line and row.
+diagnostics = logging.getLogger(f"{__name__}.diagnostics")
+DIAGNOSTIC_SAMPLES = 3
+
+def trace_diagnostics(enabled=True):
+    diagnostics.setLevel(logging.DEBUG if enabled else logging.NOTSET)
+
+def mis_load_target(table_name, annual_code):
+    # Each load replaces one term of the table, so fingerprints are kept per table and term
+    return f"DWH.{table_name.upper()}:{annual_code}"
+
+# Lines sliced per vectorized block; the temporary fixed-width array is about
+# PARSE_BLOCK_LINES * record width * 4 bytes
+PARSE_BLOCK_LINES = 50000
+
+# Bytes scanned for record terminators at a time while reading a memory-mapped file
+READ_WINDOW_BYTES = 4 * 1024 * 1024
+
+# What str.strip() removes from ASCII text; records made only of these are blank
+_WHITESPACE = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f'
+
+# Processes used to parse large files in record-aligned byte ranges (1 = parse in this process);
+# files below PARALLEL_PARSE_MIN_BYTES are not worth the process start-up
+PARSE_WORKERS = 1
+PARALLEL_PARSE_MIN_BYTES = 32 * 1024 * 1024
+
+def _fixed_width_codes(lines, width):
+    # (lines, width) array of UCS-4 code points, truncated to width, with numpy's NUL padding turned into spaces
+    block = np.array(lines, dtype=f'U{width}')
+    codes = block.view(np.uint32).reshape(len(lines), width)
+    codes[codes == 0] = ord(' ')
+    return codes
+
+def _field_strings(field):
+    # (records, width) uint8 or uint32 codes to an array of str; uint8 codes are raw ASCII bytes,
+    # which widen to UCS-4 code points as plain integers without going through a codec
+    return np.ascontiguousarray(field, dtype=np.uint32).view(f'U{field.shape[1]}').ravel()
+
+def _split_codes(codes, plan):
+    """Slices a (records, width) code array into {field: array of str} column-wise."""
+    return {
+        name: _field_strings(codes[:, start:end])
+        for name, start, end in zip(plan.names, plan.starts, plan.ends)
+    }
+
+def _split_block_python(lines, plan):
+    # Per-line slicing, for content holding NUL characters the array path cannot tell from padding
+    padded = [line.ljust(plan.width)[:plan.width] for line in lines]
+    return {
+        name: [line[start:end] for line in padded]
+        for name, start, end in zip(plan.names, plan.starts, plan.ends)
+    }
+
+def _iter_record_lines(buffer, block_lines):
+    """
+    Yields lists of at most block_lines non-blank records of buffer (bytes or mmap) as bytes.
+    \n, \r\n and bare \r all end a record (the empty piece between \r and \n is blank and skipped
+    like any blank line). Terminators are located with numpy READ_WINDOW_BYTES at a time, and
+    the pages of an mmap are released once their records have been copied out.
+    """
+    size = len(buffer)
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    window = None
+    release = getattr(buffer, "madvise", None) if hasattr(mmap, "MADV_DONTNEED") else None
+    try:
+        block = []
+        start = released = 0
+        for window_start in range(0, size, READ_WINDOW_BYTES):
+            window = data[window_start:window_start + READ_WINDOW_BYTES]
+            ends = (np.flatnonzero((window == 10) | (window == 13)) + window_start).tolist()
+            if window_start + len(window) == size and (not ends or ends[-1] < size - 1):
+                ends.append(size)
+            if not ends:
+                continue
+            starts = [start] + [end + 1 for end in ends[:-1]]
+            block.extend(line for line in (buffer[s:e] for s, e in zip(starts, ends)) if line.strip(_WHITESPACE))
+            start = ends[-1] + 1
+            while len(block) >= block_lines:
+                yield block[:block_lines]
+                del block[:block_lines]
+            consumed = min(start, size) - min(start, size) % mmap.PAGESIZE
+            if release is not None and consumed > released:
+                release(mmap.MADV_DONTNEED, released, consumed - released)
+                released = consumed
+        if block:
+            yield block
+    finally:
+        # numpy views pin the mmap; drop them so it can be closed
+        data = window = None
+
+def iter_record_blocks(file_path, block_lines):
+    """
+    Yields lists of at most block_lines non-blank raw records (bytes) of file_path. The file is
+    memory-mapped rather than read and decoded as a whole, so only the current block is copied.
+    """
+    if os.path.getsize(file_path) == 0:
+        return
+    with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield from _iter_record_lines(mapped, block_lines)
+
+def _encode_records(lines, width):
+    """
+    Turns a block of raw records into (codes, text_lines, lengths). Pure-ASCII blocks are copied
+    byte for byte into a (records, width) uint8 array without being decoded. Other blocks are
+    decoded as UTF-8 (errors replaced, as the text reader did) into UCS-4 uint32 codes, or
+    returned as text_lines when they contain NULs. lengths holds each record's length in characters.
+    """
+    if all(line.isascii() for line in lines) and not any(b'\x00' in line for line in lines):
+        lengths = np.fromiter(map(len, lines), dtype=np.int64, count=len(lines))
+        codes = np.array(lines, dtype=f'S{width}').view(np.uint8).reshape(len(lines), width)
+        codes[codes == 0] = ord(' ')
+        return codes, None, lengths
+
+    text_lines = [line for line in (raw.decode('utf-8', errors='replace') for raw in lines) if line.strip()]
+    lengths = np.fromiter(map(len, text_lines), dtype=np.int64, count=len(text_lines))
+    if any('\x00' in line for line in text_lines):
+        return None, text_lines, lengths
+    return _fixed_width_codes(text_lines, width), None, lengths
+
+def _block_frame(codes, text_lines, plan):
+    columns = _split_block_python(text_lines, plan) if codes is None else _split_codes(codes, plan)
+    return pd.DataFrame(columns, columns=plan.names)
+
+def _next_record_boundary(file, offset, size):
+    # First offset at or after `offset` that directly follows a \n, \r\n or bare \r terminator
+    if offset >= size:
+        return size
+    file.seek(offset)
+    position = offset
+    while True:
+        window = file.read(64 * 1024)
+        if not window:
+            return size
+        hits = [i for i in (window.find(b'\n'), window.find(b'\r')) if i >= 0]
+        if not hits:
+            position += len(window)
+            continue
+        i = min(hits)
+        if window[i:i + 1] == b'\r':
+            following = window[i + 1:i + 2]
+            if not following:
+                file.seek(position + i + 1)
+                following = file.read(1)
+            return position + i + (2 if following == b'\n' else 1)
+        return position + i + 1
+
+def split_byte_ranges(file_path, range_bytes):
+    """
+    Splits file_path into (start, end) byte ranges of roughly range_bytes. Every range ends just
+    after a record terminator (or at end of file), so no record or \r\n pair straddles two ranges.
+    """
+    size = os.path.getsize(file_path)
+    ranges = []
+    start = 0
+    with open(file_path, 'rb') as file:
+        while start < size:
+            end = _next_record_boundary(file, start + range_bytes, size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def _number_rows(rows):
     """
-    Parse a fixed-width file according to the specified layout.
-    Added file_code parameter to handle special cases for FA and SF files.
+    Numbers the distinct rows of a (records, bytes) uint8 array exactly, 8 bytes at a time, and
+    returns (ids, first): ids[i] is the number of row i and first[k] the first row numbered k.
+    Returns None as soon as more than half the rows turn out to be distinct.
     """
-    data = []
-    max_len = max(end for _, _, end in layout)
+    count = len(rows)
+    ids = np.zeros(count, dtype=np.int64)
+    distinct = 1
+    for offset in range(0, rows.shape[1], 8):
+        chunk = np.zeros((count, 8), dtype=np.uint8)
+        part = rows[:, offset:offset + 8]
+        chunk[:, :part.shape[1]] = part
+        chunk_ids, chunk_values = pd.factorize(chunk.view(np.uint64).ravel())
+        ids, uniques = pd.factorize(ids * len(chunk_values) + chunk_ids)
+        distinct = len(uniques)
+        if distinct * 2 > count:
+            return None
+    first = np.empty(distinct, dtype=np.int64)
+    first[ids[::-1]] = np.arange(count - 1, -1, -1)
+    return ids, first
 
+def _compact_fields(codes, plan):
+    """
+    Slices a (records, width) code array into {field: (values, ids)} for the trip back from a
+    parse worker. A field repeating its values (terms, flags, codes) is sent as its distinct
+    values plus one small integer per record, so the parent builds one str per distinct value
+    instead of one per cell; any other field is sent whole with ids None. values are codes.
+    """
+    fields = {}
+    for name, start, end in zip(plan.names, plan.starts, plan.ends):
+        field = np.ascontiguousarray(codes[:, start:end])
+        numbered = _number_rows(field.view(np.uint8).reshape(len(field), -1))
+        if numbered is None:
+            fields[name] = (field, None)
+        else:
+            ids, first = numbered
+            fields[name] = (field[first], ids.astype(np.min_scalar_type(len(first) - 1)))
+    return fields
+
+def _fields_frame(fields, plan):
+    # Parent side of _compact_fields: widens each field's codes to str and expands repeated values
+    columns = {}
+    for name, (values, ids) in fields.items():
+        if isinstance(values, np.ndarray):
+            values = _field_strings(values)
+        columns[name] = values if ids is None else values.astype(object)[ids]
+    return pd.DataFrame(columns, columns=plan.names)
+
+def _parse_byte_range(file_path, start, end, plan):
+    """
+    Process-pool worker: splits bytes [start, end) of file_path into records exactly like
+    iter_record_blocks, slices them into fields and returns (fields, lengths) for _fields_frame,
+    with fields as _compact_fields sends them. Codes are sent as uint8 whenever every character
+    is below 256; blocks holding NULs come back as lists of str from _split_block_python.
+    """
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    lines = [line for block in _iter_record_lines(data, PARSE_BLOCK_LINES) for line in block]
+    codes, text_lines, lengths = _encode_records(lines, plan.width)
+    if codes is None:
+        return {name: (values, None) for name, values in _split_block_python(text_lines, plan).items()}, lengths
+    if codes.dtype != np.uint8 and codes.size and codes.max() < 256:
+        codes = codes.astype(np.uint8)
+    return _compact_fields(codes, plan), lengths
+
+def _count_lengths(counts, lengths, width):
+    # Adds a block's records to counts: totals of short ("padded") and long ("truncated") lines and
+    # their first DIAGNOSTIC_SAMPLES record numbers, or every one at DEBUG when tracing
+    first_record = counts["records"] + 1
+    counts["records"] += len(lengths)
+    for kind, hits in (("padded", np.flatnonzero(lengths < width)), ("truncated", np.flatnonzero(lengths > width))):
+        if not len(hits):
+            continue
+        counts[kind] += len(hits)
+        samples = counts["samples"][kind]
+        samples.extend(f"record {first_record + i} ({lengths[i]} chars)" for i in hits[:DIAGNOSTIC_SAMPLES - len(samples)])
+        if diagnostics.isEnabledFor(logging.DEBUG):
+            for i in hits:
+                diagnostics.debug(f"{kind} record {first_record + i}: {lengths[i]} chars, layout width {width}")
+
+def _log_parse_summary(file_path, counts, width):
+    for kind in ("padded", "truncated"):
+        if counts[kind]:
+            diagnostics.info(
+                f"📏 {Path(file_path).name}: {counts[kind]} of {counts['records']} lines {kind} to {width} chars, "
+                f"e.g. {', '.join(counts['samples'][kind])}"
+            )
+
+def _iter_parsed_ranges(file_path, plan, workers, block_lines, counts):
+    # Parses record-aligned byte ranges on a process pool, keeping 2 ranges per worker in flight;
+    # the workers also slice the fields, leaving the parent only the DataFrame to build
+    range_bytes = max(1024 * 1024, block_lines * (plan.width + 2))
+    ranges = iter(split_byte_ranges(file_path, range_bytes))
+    pool = ProcessPoolExecutor(max_workers=workers)
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
-            content = file.read()
+        pending = deque(pool.submit(_parse_byte_range, str(file_path), start, end, plan)
+                        for start, end in islice(ranges, workers * 2))
+        while pending:
+            fields, lengths = pending.popleft().result()
+            next_range = next(ranges, None)
+            if next_range is not None:
+                pending.append(pool.submit(_parse_byte_range, str(file_path), *next_range, plan))
+            _count_lengths(counts, lengths, plan.width)
+            if len(lengths):
+                yield _fields_frame(fields, plan)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
 
-            # Try splitting on \r (Mac-style) if no \n is present
-            if '\n' not in content:
-                print("[DEBUG] Splitting on \\r")
-                lines = content.split('\r')
-            else:
-                print("[DEBUG] Splitting on \\n")
-                lines = content.splitlines()
-                
-            print(f"[DEBUG] Total lines detected: {len(lines)}")
-            print(f"[DEBUG] Layout expects width: {max_len}")    
+def _iter_parsed_serial(file_path, plan, block_lines, counts):
+    for lines in iter_record_blocks(file_path, block_lines):
+        codes, text_lines, lengths = _encode_records(lines, plan.width)
+        _count_lengths(counts, lengths, plan.width)
+        if len(lengths):
+            yield _block_frame(codes, text_lines, plan)
 
-            # 🔍 Inspect first 5 lines for length & content
-            for i, raw_line in enumerate(lines[:5]):
-                print(f"[DEBUG] Line {i} — len={len(raw_line)} — {repr(raw_line)}")
+def iter_parsed_blocks(file_path, layout, block_lines=None, counts=None, workers=None, use_cache=None, fingerprint=None):
+    """
+    Yields DataFrames of at most block_lines (default PARSE_BLOCK_LINES) parsed records, so only
+    one block of the file is in memory at a time. Blank lines are skipped. Lines are padded with
+    spaces (or truncated) to the layout width; since every padded line is exactly that wide, FA
+    and SF files, whose records are often short, get empty-padded fields the same way.
+    With workers (default PARSE_WORKERS) above 1, files of PARALLEL_PARSE_MIN_BYTES or more are
+    parsed on a process pool in record-aligned byte ranges instead; blocks still come back in file
+    order with identical content, though their boundaries follow the byte ranges.
+    Padded and truncated lines are summarised on the diagnostics channel once the file is read.
+    If a counts dict is passed it receives the "records", "padded" (short line) and "truncated"
+    (long line) totals, and a few example records per kind under "samples".
+    With use_cache (default: parse_cache.PARSE_CACHE_ENABLED and pyarrow installed) a file already
+    parsed with the same layout is read back from the parse cache in its original blocks, and a
+    fresh parse is written to it once parse_cache.admit lets it in. fingerprint, when load_fingerprints
+    already computed it for the file, saves hashing the file again for the cache key.
+    """
+    plan = get_layout(layout)
+    block_lines = block_lines or PARSE_BLOCK_LINES
+    workers = workers or PARSE_WORKERS
+    if use_cache is None:
+        use_cache = parse_cache.cache_enabled()
+    if counts is None:
+        counts = {}
+    counts.update(records=0, padded=0, truncated=0, samples={"padded": [], "truncated": []})
 
-            for i, line in enumerate(lines):
-                if not line.strip():
-                    continue
+    cache_key = None
+    if use_cache:
+        cache_key, fingerprint = parse_cache.cache_key(file_path, plan, fingerprint)
+        entry = parse_cache.lookup(cache_key)
+        if entry is not None:
+            logger.info(f"♻️ Using cached parse of {Path(file_path).name} ({entry['counts']['records']} records)")
+            counts.update(entry["counts"])
+            yield from parse_cache.iter_cached_blocks(cache_key)
+            _log_parse_summary(file_path, counts, plan.width)
+            return
 
-                if len(line) < max_len:
-                    print(f"[DEBUG] Padding short line {i} from {len(line)} → {max_len}")
-                    padded = line.ljust(max_len)
-                else:
-                    padded = line[:max_len]  # Truncate if longer than expected
+    if workers > 1 and os.path.getsize(file_path) >= PARALLEL_PARSE_MIN_BYTES:
+        blocks = _iter_parsed_ranges(file_path, plan, workers, block_lines, counts)
+    else:
+        blocks = _iter_parsed_serial(file_path, plan, block_lines, counts)
+    if cache_key is not None and parse_cache.admit(cache_key, fingerprint):
+        blocks = parse_cache.write_through(cache_key, fingerprint, blocks, counts)
+    yield from blocks
+    _log_parse_summary(file_path, counts, plan.width)
 
-                try:
-                    # Special handling for FA and SF files
-                    if file_code in ["FA", "SF"]:
-                        # Create a row with all fields initialized to empty strings
-                        row = {name: "" for name, _, _ in layout}
-                        
-                        # Only extract fields that are within the actual line length
-                        for name, start, end in layout:
-                            if start < len(padded):
-                                actual_end = min(end, len(padded))
-                                row[name] = padded[start:actual_end]
-                    else:
-                        # Standard parsing for other file types
-                        row = {
-                            name: padded[start:end]
-                            for name, start, end in layout
-                        }
-                    data.append(row)
-                except Exception as e:
-                    print(f"❌ Error parsing line {i}: {e}")
-                    print(f"🔍 Line content: {repr(line)}")
-                    if file_code in ["FA", "SF"]:
-                        # For FA/SF files, continue with best-effort parsing
-                        print(f"⚠️ Continuing with best-effort parsing for {file_code} file")
-                        continue
-                    else:
-                        raise
+def parse_fixed_width_file(file_path, layout, file_code=None, workers=None):
+    """
+    Parse a fixed-width file according to the specified layout into a single DataFrame.
+    Loaders stream the file with iter_parsed_blocks instead; this is kept for callers that need
+    the whole file at once. workers (default PARSE_WORKERS) > 1 parses large files in parallel.
+    """
+    try:
+        frames = list(iter_parsed_blocks(file_path, layout, workers=workers))
     except Exception as e:
         print(f"❌ Fatal error in parse_fixed_width_file: {e}")
         print(f"Traceback: {traceback.format_exc()}")
         raise
 
-    print(f"✅ Returning parsed DataFrame with {len(data)} rows")
-    return pd.DataFrame(data)
+    if not frames:
+        print("✅ Returning parsed DataFrame with 0 rows")
+        return pd.DataFrame()
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    print(f"✅ Returning parsed DataFrame with {len(df)} rows")
+    return df
 
-def load_to_oracle(df, table_name, annual_code, conn, cursor, layout, file_code=None):
-    """Load data into Oracle Database"""
-    logger.info(f"Starting load_to_oracle for table {table_name} with {len(df)} rows")
-    
+def term_partition_name(annual_code):
+    return "P_" + re.sub(r'[^A-Z0-9_]', '_', str(annual_code).upper())
+
+def _ensure_term_partition(cursor, table_name, annual_code):
+    # Adds the term's list partition unless the table already has it; returns its name
+    partition = term_partition_name(annual_code)
+    cursor.execute("""
+        SELECT COUNT(*) FROM all_tab_partitions
+        WHERE table_owner = 'DWH' AND table_name = :1 AND partition_name = :2
+    """, [table_name.upper(), partition])
+    if cursor.fetchone()[0] == 0:
+        term = str(annual_code).replace("'", "''")
+        cursor.execute(f"ALTER TABLE DWH.{table_name.upper()} ADD PARTITION {partition} VALUES ('{term}')")
+        logger.info(f"🆕 Added partition {partition} to {table_name} for GI03_TERM_ID = {annual_code}")
+    return partition
+
+def _prepare_term_partition(table_name, annual_code, cursor, method):
+    """
+    Gets the term's partition of a partitioned table ready for reloading. "truncate" empties it
+    now, for good (it is DDL, so it commits); "exchange" creates an empty staging copy of the table
+    to load instead.
+    Returns (load_table, partition).
+    """
+    partition = _ensure_term_partition(cursor, table_name, annual_code)
+    if method == "truncate":
+        print(f"🧹 Truncating partition {partition} of {table_name}")
+        cursor.execute(f'ALTER TABLE DWH.{table_name.upper()} TRUNCATE PARTITION {partition} UPDATE GLOBAL INDEXES')
+        logger.info(f"🧹 Truncated partition {partition} of {table_name} for GI03_TERM_ID = {annual_code}")
+        return table_name.upper(), partition
+
+    staging = staging_table_name(table_name)
+    cursor.execute(f'CREATE TABLE DWH.{staging} NOLOGGING AS SELECT * FROM DWH.{table_name.upper()} WHERE 1 = 0')
+    catalog_cache.note_table_copied("DWH", staging, table_name)
+    abort_manager.register_created_table(staging)
+    logger.info(f"🧱 Loading GI03_TERM_ID = {annual_code} into staging table {staging} for partition {partition}")
+    return staging, partition
+
+def exchange_term_partition(cursor, table_name, partition, staging):
+    """
+    Swaps a loaded staging table in as the partition of DWH.table_name and drops the staging
+    table, which then holds the term's previous rows. Oracle checks that every staged row
+    belongs to the partition; local index partitions are rebuilt and global indexes maintained.
+    """
+    table = table_name.upper()
+    cursor.execute(f'ALTER TABLE DWH.{staging} LOGGING')
+    cursor.execute(
+        f'ALTER TABLE DWH.{table} EXCHANGE PARTITION {partition} WITH TABLE DWH.{staging} '
+        f'EXCLUDING INDEXES WITH VALIDATION UPDATE GLOBAL INDEXES'
+    )
+    logger.info(f"🔀 Exchanged staging table {staging} in as partition {partition} of {table_name}")
+    cursor.execute(f'ALTER TABLE DWH.{table} MODIFY PARTITION {partition} REBUILD UNUSABLE LOCAL INDEXES')
+    cursor.execute(f'DROP TABLE DWH.{staging} PURGE')
+    catalog_cache.note_table_dropped("DWH", staging)
+
+def _drop_staging_table(cursor, staging):
     try:
-        df.columns = [str(col).upper() for col in df.columns]
-        print(f"📊 DataFrame loaded for {table_name} — {len(df)} rows")
-        print(f"🧪 Columns: {df.columns.tolist()}")
+        cursor.execute(f'DROP TABLE DWH.{staging} PURGE')
+        catalog_cache.note_table_dropped("DWH", staging)
     except Exception as e:
-        print(f"🔥 Failed to uppercase column names: {e}")
-        print("🔍 Raw df.columns:", df.columns)
-        raise
-    
-    print(f"📊 DataFrame loaded for {table_name} — {len(df)} rows")
-    if not df.empty:
-        print("🧪 First row sample:", df.iloc[0].to_dict())
-    else:
-        print("❌ DataFrame is empty!")    
-        
+        logger.warning(f"⚠️ Could not drop staging table {staging}: {e}")
+
+# Set before a term's DELETE and rolled back to if the file then fails to load
+TERM_SAVEPOINT = "MIS_TERM_RELOAD"
+
+def prepare_mis_table(table_name, annual_code, cursor, layout, file_code=None, bulk=False, partition_by_term=None):
+    """
+    Makes sure DWH.table_name exists for the fields of layout and removes the rows of annual_code.
+    New tables get one VARCHAR2 per field sized to its width (column_ddl), and are list-partitioned
+    by GI03_TERM_ID when partition_by_term (default PARTITION_BY_TERM) is set. Terms of partitioned
+    tables are replaced through their partition (see PARTITION_RELOAD_METHOD) instead of a DELETE.
+    Returns {"insert_sql", "input_sizes", "safe_index_cols", "bulk_created", "direct_path",
+    "partitioned", "partition", "staging", "savepoint"}, or None if the table could not be created. Rows go direct-path when
+    direct_path is set; a staging table must be exchanged in (exchange_term_partition) once loaded.
+    A DELETE of the term is preceded by the savepoint returned, so a failed load can put the term back.
+    """
+    if partition_by_term is None:
+        partition_by_term = PARTITION_BY_TERM
+    layout = get_layout(layout)
+    columns = layout.names
     print("🧱 Checking if table exists...")
 
     try:
-        cursor.execute("""
-            SELECT COUNT(*) FROM all_tables 
-            WHERE table_name = :1 AND owner = 'DWH'
-        """, [table_name.upper()])
-        exists = cursor.fetchone()[0] > 0
+        exists = catalog_cache.table_exists(cursor, "DWH", table_name)
         print(f"✅ Table exists? {exists}")
     except Exception as e:
         print(f"❌ Error checking if table exists: {e}")
@@ -133,43 +492,72 @@ def load_to_oracle(df, table_name, annual_code, conn, cursor, layout, file_code=
     
     logger.info(f"About to create table {table_name}")
 
+    # Index columns are the same whether the index is built now or after a bulk load
+    safe_index_cols = [col for col in ["GI90_RECORD_CODE", "GI01_DISTRICT_COLLEGE_ID", "GI03_TERM_ID"] if col in columns] if file_code not in ["FA", "SF"] else []
+    bulk_created = False
+    partitioned = exists and catalog_cache.is_partitioned(cursor, "DWH", table_name)
+
     if not exists:
         try:
-            columns = ', '.join([
-                f'{col.upper()} VARCHAR2(2)' if col.upper() == 'GI90_RECORD_CODE' else
-                f'{col.upper()} VARCHAR2(3)' if col.upper() in ['GI01_DISTRICT_COLLEGE_ID', 'GI03_TERM_ID'] else
-                f'{col.upper()} VARCHAR2(9)' if col.upper() == 'SB00_STUDENT_ID' else
-                f'{col.upper()} VARCHAR2(4000)'
-                for col in df.columns
-            ])
-            create_sql = f'CREATE TABLE DWH.{table_name.upper()} ({columns})'
+            create_sql = f'CREATE TABLE DWH.{table_name.upper()} ({column_ddl(layout)})'
+            
+            if bulk:
+                create_sql += ' NOLOGGING'
+            if partition_by_term and 'GI03_TERM_ID' in columns:
+                term = str(annual_code).replace("'", "''")
+                create_sql += f" PARTITION BY LIST (GI03_TERM_ID) (PARTITION {term_partition_name(annual_code)} VALUES ('{term}'))"
+                partitioned = True
             
             print("📜 SQL:", create_sql)
             
             cursor.execute(create_sql)
-            cursor.execute(f'GRANT SELECT ON DWH.{table_name.upper()} TO PUBLIC')
-            abort_manager.register_created_table(table_name)
-            logger.info(f"Table {table_name} created successfully")
-            logger.info(f"🆕 Created table {table_name} and granted SELECT to PUBLIC.")
+            catalog_cache.note_table_created("DWH", table_name, column_types(layout), partitioned)
+            if bulk:
+                abort_manager.register_created_table(table_name)
+                bulk_created = True
+                logger.info(f"🆕 Created table {table_name} NOLOGGING for bulk load (grant and index deferred).")
+            else:
+                cursor.execute(f'GRANT SELECT ON DWH.{table_name.upper()} TO PUBLIC')
+                abort_manager.register_created_table(table_name)
+                logger.info(f"Table {table_name} created successfully")
+                logger.info(f"🆕 Created table {table_name} and granted SELECT to PUBLIC.")
         except Exception as e:
             logger.error(f"❌ Failed to create table {table_name}: {e}")
+            partitioned = False
             if file_code in ["FA", "SF"]:
                 logger.warning(f"⚠️ Continuing despite table creation error for {file_code} file")
             else:
-                return False
+                return None
 
         # Create index with special handling for FA and SF files
-        if file_code not in ["FA", "SF"]:
+        if file_code not in ["FA", "SF"] and not bulk_created:
             # Only create indexes for non-FA/SF tables to avoid indexing issues
-            safe_index_cols = [col for col in ["GI90_RECORD_CODE", "GI01_DISTRICT_COLLEGE_ID", "GI03_TERM_ID"] if col in df.columns]
             logger.debug(f"🔍 Attempting to index columns in {table_name}: {safe_index_cols}")
             try:
-                create_index_if_columns_exist(cursor, "DWH", table_name, safe_index_cols)
+                create_index_if_columns_exist(cursor, "DWH", table_name, safe_index_cols, local=partitioned)
             except Exception as e:
                 logger.warning(f"⚠️ Index creation failed but continuing: {e}")
 
+    load_table = table_name.upper()
+    partition = None
+    # Direct-path batches commit one by one, so they only go where nothing older can be left half
+    # replaced: tables this run creates, a staging table exchanged in once complete, or a partition
+    # already truncated (and committed) by the "truncate" method
+    direct_path = bulk_created
+    if partitioned and exists:
+        load_table, partition = _prepare_term_partition(table_name, annual_code, cursor, PARTITION_RELOAD_METHOD)
+        direct_path = True
+    elif partition_by_term and exists:
+        logger.info(f"ℹ️ {table_name} is not partitioned by GI03_TERM_ID; replacing term {annual_code} with a DELETE")
+
+    savepoint = None
     try:
-        if 'GI03_TERM_ID' in df.columns:
+        if 'GI03_TERM_ID' in columns and not partitioned:
+            # Direct-path batches commit, which would discard the savepoint; they only go into
+            # tables created this run, where the DELETE has nothing to remove
+            if not direct_path:
+                cursor.execute(f'SAVEPOINT {TERM_SAVEPOINT}')
+                savepoint = TERM_SAVEPOINT
             print(f"🧹 Deleting old data for GI03_TERM_ID = {annual_code}")
             cursor.execute(f'DELETE FROM DWH.{table_name.upper()} WHERE GI03_TERM_ID = :1', [annual_code])
             logger.info(f"🧹 Deleted existing records from {table_name} for GI03_TERM_ID = {annual_code}")
@@ -177,85 +565,272 @@ def load_to_oracle(df, table_name, annual_code, conn, cursor, layout, file_code=
         logger.warning(f"⚠️ Error deleting old data: {e}")
         # Continue despite error
 
-    try:
-        columns = ', '.join(f'{col.upper()}' for col in df.columns)
-        values = ', '.join(f':{i+1}' for i in range(len(df.columns)))
-        insert_sql = f'INSERT INTO DWH.{table_name.upper()} ({columns}) VALUES ({values})'
-    except Exception as e:
-        logger.error(f"❌ Error preparing INSERT SQL: {e}")
-        if file_code in ["FA", "SF"]:
-            logger.warning(f"⚠️ Cannot continue with {file_code} file due to SQL preparation error")
-            return False
-        else:
-            raise
-    
-    # Drop rows where all values are empty
-    try:
-        df = df[~(df == '').all(axis=1)]
-    except Exception as e:
-        logger.warning(f"⚠️ Error dropping empty rows: {e}")
-        # Continue despite error
+    column_list = ', '.join(f'{col.upper()}' for col in columns)
+    values = ', '.join(f':{i+1}' for i in range(len(columns)))
+    insert_sql = f'INSERT INTO DWH.{load_table} ({column_list}) VALUES ({values})'
+    return {
+        "insert_sql": insert_sql, "input_sizes": column_sizes(layout), "safe_index_cols": safe_index_cols,
+        "bulk_created": bulk_created, "direct_path": direct_path, "partitioned": partitioned, "partition": partition,
+        "staging": load_table if load_table != table_name.upper() else None, "savepoint": savepoint,
+    }
+
+def _column_masks(values):
+    # (empty, blank) arrays for one column: exactly '' / missing or whitespace-only, computed in C by np.char
+    text = values.to_numpy(dtype=object)
+    missing = np.equal(text, None) | (text != text)
+    if missing.any():
+        text = np.where(missing, '', text)
+    text = text.astype(str)
+    empty = (np.char.str_len(text) == 0) & ~missing
+    blank = missing | (np.char.str_len(np.char.strip(text)) == 0)
+    return empty, blank
+
+def validate_mis_block(df, layout, file_code=None):
+    """
+    Splits a parsed block into (rows to insert, rejected rows), column by column.
+    Rows whose fields are all empty strings are dropped. Except for FA/SF files, a row with a
+    blank required (non-FILLER) field is rejected; rejected rows carry a REJECT_REASON naming
+    the first missing field.
+    """
+    masks = {col: _column_masks(df[col]) for col in df.columns}
+    not_empty = ~np.logical_and.reduce([empty for empty, _ in masks.values()]) if masks else np.ones(len(df), bool)
+    if file_code in ["FA", "SF"]:
+        # For FA/SF files, use a more lenient approach
+        return df[not_empty].fillna('').astype(str), df.iloc[:0]
+
+    required_fields = get_layout(layout).required
+    missing = pd.DataFrame({col: masks[col][1] for col in required_fields}, index=df.index)
+    is_rejected = missing.any(axis=1).to_numpy() & not_empty
+
+    rejected = df[is_rejected].copy()
+    if not rejected.empty:
+        missing = missing[is_rejected]
+        extra = missing.sum(axis=1) - 1
+        rejected["REJECT_REASON"] = (
+            "missing " + missing.idxmax(axis=1)
+            + np.where(extra > 0, " (+" + extra.astype(str) + " more)", "")
+        )
+
+    keep = not_empty & ~is_rejected
+    valid = df[keep].fillna('').astype(str)
+    # Blank FILLER fields have always been stored as the text 'None'; kept so reloaded terms
+    # match the rows already in the tables
+    for col in df.columns.difference(required_fields):
+        valid.loc[masks[col][1][keep], col] = 'None'
+    return valid, rejected
+
+def _count_rejects(reasons, rejected):
+    # Tallies rejected rows by reason ("missing <field>" or the ORA- code) into reasons, keeping
+    # their first DIAGNOSTIC_SAMPLES record numbers, or logging every row at DEBUG when tracing
+    if diagnostics.isEnabledFor(logging.DEBUG):
+        for record, reason in rejected["REJECT_REASON"].items():
+            diagnostics.debug(f"rejected record {record}: {reason}")
+    keys = rejected["REJECT_REASON"].str.replace(r" \(\+\d+ more\)$", "", regex=True)
+    keys = keys.str.extract(r"^(ORA-\d+)", expand=False).fillna(keys)
+    for key, records in keys.groupby(keys, sort=False).groups.items():
+        count, samples = reasons.get(key, (0, []))
+        samples.extend(str(record) for record in records[:DIAGNOSTIC_SAMPLES - len(samples)])
+        reasons[key] = (count + len(records), samples)
+
+def _log_reject_summary(table_name, reasons):
+    for key, (count, samples) in sorted(reasons.items(), key=lambda item: -item[1][0]):
+        diagnostics.info(f"🚫 {table_name}: {count} rows rejected for {key} (e.g. records {', '.join(samples)})")
+
+def reject_file_path(table_name, annual_code):
+    return REJECT_FOLDER / f"{table_name.upper()}_{annual_code}_rejects.csv"
+
+def _write_rejects(reject_path, rejected, first_write):
+    if first_write:
+        reject_path.parent.mkdir(parents=True, exist_ok=True)
+    rejected.to_csv(reject_path, mode='w' if first_write else 'a', header=first_write, index=False)
+
+def validated_blocks(blocks, layout, file_code=None):
+    """
+    Yields validate_mis_block's (valid, rejected) pair for each parsed block, with the layout's
+    column names and the 1-based record numbers (blank lines excluded) as the index.
+    """
+    columns = get_layout(layout).names
+    record_offset = 0
+    for block in blocks:
+        block.columns = columns
+        block.index = pd.RangeIndex(record_offset + 1, record_offset + len(block) + 1, name="RECORD")
+        record_offset += len(block)
+        yield validate_mis_block(block, layout, file_code)
+
+def load_blocks_to_oracle(blocks, table_name, annual_code, conn, cursor, layout, file_code=None, bulk=None, stats=None):
+    """
+    Load an iterator of (valid, rejected) block pairs from validated_blocks into DWH.table_name,
+    replacing the rows of annual_code. Each block is inserted in executemany batches with batch
+    errors before the next one is read, so memory use is bounded by the block size rather than the file size.
+    Rows failing validation or rejected by Oracle are written, with their record number, stage and
+    reason, to reject_file_path(table_name, annual_code) instead of being printed one by one.
+    bulk (default table_utils.BULK_LOAD_MODE) creates new tables NOLOGGING, inserts into them
+    direct-path and builds the grant and indexes after the rows are in. Terms of tables partitioned by
+    GI03_TERM_ID are reloaded through their partition (see PARTITION_BY_TERM).
+    If a stats dict is passed it receives the inserted ("rows"), failed insert ("failed") and
+    validation-rejected ("rejected") counts.
+    """
+    if bulk is None:
+        bulk = table_utils.BULK_LOAD_MODE
+    layout = get_layout(layout)
+    logger.info(f"Starting load for table {table_name} ({len(layout.names)} columns)")
+
+    table = prepare_mis_table(table_name, annual_code, cursor, layout, file_code, bulk)
+    if table is None:
+        return False
+    if file_code in ["FA", "SF"]:
+        logger.info(f"🔧 Using lenient validation for {file_code} file")
 
-    # Special handling for required fields validation based on file type
+    reject_path = reject_file_path(table_name, annual_code)
+    reject_path.unlink(missing_ok=True)
+    rejects_written = False
+
+    direct_path = table["direct_path"]
+    print(f"🧪 Starting {'direct-path ' if direct_path else ''}batch insert...")
+    inserted = 0
+    failed = 0
+    rejected_count = 0
+    processed = 0
+    reject_reasons = {}
     try:
-        if file_code in ["FA", "SF"]:
-            # For FA/SF files, use a more lenient approach
-            logger.info(f"🔧 Using lenient validation for {file_code} file")
-            df = df.fillna('')  # Replace NaN with empty string
-            df = df.astype(str)  # Convert all columns to string
-        else:
-            # For other files, use the standard validation
-            required_fields = [name for name, _, _ in layout if 'FILLER' not in name]
-            df = df.applymap(lambda x: None if isinstance(x, str) and x.strip() == '' else x)
-            df = df.dropna(subset=required_fields, how='any')
-            df = df.astype(str)
-    except Exception as e:
-        logger.warning(f"⚠️ Error during field validation: {e}")
-        # Fallback approach for all file types if validation fails
-        try:
-            df = df[~(df == '').all(axis=1)]
-            df = df.fillna('')
-            df = df.astype(str)
-        except Exception as e2:
-            logger.error(f"❌ Even fallback validation failed: {e2}")
-            if file_code in ["FA", "SF"]:
-                logger.warning(f"⚠️ Cannot continue with {file_code} file due to validation errors")
+        for valid, rejected in blocks:
+            processed += len(valid) + len(rejected)
+            insert_errors = []
+            result = insert_rows_batched(
+                cursor, conn, table["insert_sql"], valid.itertuples(index=False, name=None),
+                f"DWH.{table_name}", direct_path=direct_path, rejects=insert_errors, input_sizes=table["input_sizes"]
+            )
+            if result is None:
                 return False
-            else:
-                raise
-    
-    print("🧪 Starting insert loop...")
-    inserted = 0 
+            inserted += result[0]
+            failed += result[1]
+            rejected_count += len(rejected)
 
-    for _, row in df.iterrows():
+            if insert_errors:
+                failed_rows = valid.iloc[[row_number for row_number, _, _ in insert_errors]].copy()
+                failed_rows["REJECT_REASON"] = [message for _, _, message in insert_errors]
+                rejected = pd.concat([rejected, failed_rows]).sort_index()
+            if not rejected.empty:
+                _count_rejects(reject_reasons, rejected)
+                rejected.insert(0, "REJECT_STAGE", np.where(rejected.index.isin(valid.index), "insert", "validation"))
+                _write_rejects(reject_path, rejected.reset_index(), not rejects_written)
+                rejects_written = True
+            logger.debug(f"📦 {processed} records processed for {table_name}")
         if abort_manager.should_abort:
+            # The blocks may have stopped early; never exchange in or finish a partial file
             abort_manager.cleanup_on_abort(conn, cursor)
             return False
-            
-        if len(row) != len(df.columns):
-            logger.error(f"❌ Row column mismatch in {table_name}: {row}")
-            continue  # skip problematic row
+        if table["staging"]:
+            exchange_term_partition(cursor, table_name, table["partition"], table["staging"])
+    except Exception:
+        if abort_manager.should_abort:
+            abort_manager.cleanup_on_abort(conn, cursor)
+            return False
+        if table["staging"]:
+            # The partition was never touched; just discard the partial staging table
+            _drop_staging_table(cursor, table["staging"])
+        elif table["savepoint"]:
+            # A read or parse failure part way through: undo the partial insert and the term's DELETE
+            try:
+                cursor.execute(f'ROLLBACK TO SAVEPOINT {table["savepoint"]}')
+                logger.warning(f"⏪ Restored the previous rows of {table_name} for GI03_TERM_ID = {annual_code}")
+            except Exception as e:
+                logger.error(f"❌ Could not restore the previous rows of {table_name} for GI03_TERM_ID = {annual_code}: {e}")
+        raise
 
-        if any(pd.isna(v) for v in row.values):
-            logger.warning(f"⚠️ NULL value detected in row for {table_name}: {row}")
-        
+    if table["bulk_created"]:
+        finish_bulk_load(cursor, "DWH", table_name, table["safe_index_cols"], local_index=table["partitioned"])
+    if stats is not None:
+        stats.update(rows=inserted, failed=failed, rejected=rejected_count)
+    logger.info(f"✅ Loaded {inserted} rows into {table_name}{' direct-path' if direct_path else ''} ({failed} failed)")
+    if rejects_written:
+        logger.warning(f"🚫 {rejected_count} rows failed validation and {failed} were rejected by Oracle for {table_name}; see {reject_path}")
+        _log_reject_summary(table_name, reject_reasons)
+    return True
+
+def load_mis_file(file_path, table_name, annual_code, conn, cursor, layout, file_code=None, bulk=None, stats=None, fingerprint=None):
+    """
+    Streams one MIS .dat file into DWH.table_name, PARSE_BLOCK_LINES records at a time.
+    fingerprint is the file's load_fingerprints fingerprint, if already computed.
+    """
+    blocks = validated_blocks(iter_parsed_blocks(file_path, layout, fingerprint=fingerprint), layout, file_code)
+    return load_blocks_to_oracle(blocks, table_name, annual_code, conn, cursor, layout, file_code, bulk, stats)
+
+def _produce_blocks(files, out_queue, stop):
+    # Parser thread: puts (file index, validated block) for every block, then (file index, _END) or the exception
+    def put(item):
+        while not stop.is_set():
+            try:
+                out_queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    for index, (file_path, layout, file_code, fingerprint) in enumerate(files):
         try:
-            cursor.execute(insert_sql, tuple(row))
-            inserted += 1
+            for block in validated_blocks(iter_parsed_blocks(file_path, layout, fingerprint=fingerprint), layout, file_code):
+                if abort_manager.should_abort or not put((index, block)):
+                    return
+            item = (index, _END)
         except Exception as e:
-            print(f"❌ INSERT ERROR: {e}")
-            print(f"🧪 Row content: {row.to_dict()}")
-            
-            if file_code in ["FA", "SF"]:
-                # For FA/SF files, log the error but continue with other rows
-                logger.warning(f"⚠️ Error inserting row for {file_code} file, continuing: {e}")
-                continue
-            else:
-                raise
-            
-    logger.info(f"Successfully loaded {len(df)} rows into {table_name}")    
-    logger.info(f"✅ Loaded {inserted} rows into {table_name}")
-    return True
+            item = (index, e)
+        if not put(item):
+            return
+
+def iter_pipelined_files(files, queue_blocks=None):
+    """
+    Yields one iterator of validated blocks per (file_path, layout, file_code, fingerprint) in files, like
+    validated_blocks, while a parser thread parses and validates ahead through a queue of at most
+    queue_blocks (default PIPELINE_QUEUE_BLOCKS) blocks. The next file is prepared while the
+    current one is being inserted.
+    Blocks a consumer leaves unread are discarded before the next file's iterator is handed out;
+    close() stops the parser thread.
+    """
+    out_queue = queue.Queue(maxsize=queue_blocks or PIPELINE_QUEUE_BLOCKS)
+    stop = threading.Event()
+    parser = threading.Thread(target=_produce_blocks, args=(files, out_queue, stop), name="mis_parser", daemon=True)
+    parser.start()
+
+    def file_blocks(done):
+        while True:
+            try:
+                _, item = out_queue.get(timeout=0.5)
+            except queue.Empty:
+                if parser.is_alive():
+                    continue
+                # Parser stopped (abort) before this file's end; it must not pass for a complete file
+                done.append(True)
+                raise RuntimeError("MIS parser stopped before the end of the file")
+            if item is _END:
+                done.append(True)
+                return
+            if isinstance(item, Exception):
+                done.append(True)
+                raise item
+            yield item
+
+    try:
+        for _ in files:
+            done = []
+            yield file_blocks(done)
+            if not done:
+                try:
+                    for _ in file_blocks(done):
+                        pass
+                except Exception:
+                    pass  # the consumer already gave up on this file
+    finally:
+        stop.set()
+        parser.join()
+
+def load_to_oracle(df, table_name, annual_code, conn, cursor, layout, file_code=None, bulk=None, stats=None):
+    """
+    Load an already parsed DataFrame into Oracle Database (see load_blocks_to_oracle).
+    """
+    logger.info(f"Starting load_to_oracle for table {table_name} with {len(df)} rows")
+    blocks = validated_blocks([df] if not df.empty else [], layout, file_code)
+    return load_blocks_to_oracle(blocks, table_name, annual_code, conn, cursor, layout, file_code, bulk, stats)
 
 def run_mis_loader(existing_conn=None):    
     """
@@ -320,6 +895,12 @@ def run_mis_loader(existing_conn=None):
         success_count = 0
         error_count = 0
         total_files = 0
+        load_fingerprints.reset_skipped()
+        catalog_cache.reset()
+        # (target, fingerprint, rows) recorded once the final commit succeeds
+        pending_fingerprints = []
+        # Files to load, collected first so they can be parsed ahead in PIPELINE_MODE
+        jobs = []
         
         preloop_state = f"Start loop — success_count={success_count}, error_count={error_count}, total={total_files}"
         logger.debug(preloop_state)        
@@ -342,36 +923,55 @@ def run_mis_loader(existing_conn=None):
                 logger.info(f"Table name will be: {table_name}")                
                 print(f"📄 Attempting to parse file: {file_path}")
                 print(f"🧪 Layout fields: {len(LAYOUTS[file_code])}")
-                logger.info(f"📥 Processing {filename} into {table_name}...")
 
+                target = mis_load_target(table_name, annual_code)
                 try:
-                    # Pass file_code to parse_fixed_width_file for special handling
-                    df = parse_fixed_width_file(file_path, LAYOUTS[file_code], file_code)
-                    print(f"✅ Parsed DataFrame for {filename} — {len(df)} rows")
-                    if not df.empty:
-                        print("🔎 First 1 row:", df.head(1).to_dict(orient="records"))
-                    layout = LAYOUTS[file_code]
-                except Exception as e:
-                    import traceback
-                    traceback.print_exc()
-                    logger.error(f"🔥 Failed while parsing {filename}: {e}")
-                    
-                    if file_code in ["FA", "SF"]:
-                        # For FA/SF files, log the error but continue with other files
-                        logger.warning(f"⚠️ Error parsing {file_code} file, continuing with other files: {e}")
-                        error_count += 1
-                        continue
-                    else:
-                        error_count += 1
-                        continue
-   
-                print("🧪 Calling load_to_oracle with table", table_name)
-                
+                    unchanged, fingerprint = load_fingerprints.check_unchanged(file_path, target, cursor, where=("GI03_TERM_ID", annual_code))
+                except OSError as e:
+                    logger.error(f"❌ Could not read {filename}: {e}")
+                    error_count += 1
+                    continue
+                if unchanged:
+                    continue
+
+                jobs.append({
+                    "filename": filename, "file_path": file_path, "annual_code": annual_code,
+                    "file_code": file_code, "table_name": table_name, "layout": LAYOUTS[file_code],
+                    "target": target, "fingerprint": fingerprint,
+                })
+
+        # With PIPELINE_MODE the next files are parsed on a separate thread while this one inserts
+        if PIPELINE_MODE and len(jobs) > 1:
+            logger.info(f"🧵 Parsing ahead of the inserts (queue of {PIPELINE_QUEUE_BLOCKS} blocks)")
+            block_sources = iter_pipelined_files(
+                [(job["file_path"], job["layout"], job["file_code"], job["fingerprint"]) for job in jobs]
+            )
+        else:
+            block_sources = (
+                validated_blocks(
+                    iter_parsed_blocks(job["file_path"], job["layout"], fingerprint=job["fingerprint"]), job["layout"], job["file_code"]
+                )
+                for job in jobs
+            )
+
+        try:
+            for job, blocks in zip(jobs, block_sources):
+                if abort_manager.should_abort:
+                    break
+                filename = job["filename"]
+                file_code = job["file_code"]
+                table_name = job["table_name"]
+                logger.info(f"📥 Processing {filename} into {table_name}...")
+
                 try:
-                    # Pass file_code to load_to_oracle for special handling
-                    file_success = load_to_oracle(df, table_name, annual_code, conn, cursor, layout, file_code)
+                    # Parsing happens block by block inside the load, so parse errors land here too
+                    load_stats = {}
+                    file_success = load_blocks_to_oracle(
+                        blocks, table_name, job["annual_code"], conn, cursor, job["layout"], file_code, stats=load_stats
+                    )
                     if file_success:
                         success_count += 1
+                        pending_fingerprints.append((job["target"], job["fingerprint"], load_stats.get("rows")))
                     else:
                         error_count += 1
                 except Exception as e:
@@ -385,6 +985,8 @@ def run_mis_loader(existing_conn=None):
                     else:
                         error_count += 1
                         continue
+        finally:
+            block_sources.close()
                     
         logger.info("🧪 ABOUT TO CHECK abort_manager.should_abort")                    
         logger.info(f"🧾 Loop finished. Final counts — success: {success_count}, error: {error_count}, total: {total_files}")                        
@@ -392,6 +994,9 @@ def run_mis_loader(existing_conn=None):
             try:                
                 conn.commit()
                 logger.info("🧪 Commit successful")
+                for target, fingerprint, rows in pending_fingerprints:
+                    load_fingerprints.record_load(target, fingerprint, rows)
+                load_fingerprints.log_skipped_summary()
                 logger.info(f"✅ MIS loading complete: {success_count} files loaded successfully, {error_count} files with errors out of {total_files} total files.")
                 return success_count > 0  # Return True if at least one file was loaded successfully
             except Exception as e:
@@ -1,14 +1,27 @@
 # SCFF Data Loader with Datestamp Check and Abort Rollback
+import csv
 import os
 import oracledb
 import pandas as pd
 from datetime import datetime
 import re
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from libs.headless_connector import get_worker_connection
 from libs.oracle_db_connector import get_db_connection
 from pathlib import Path
 from libs import abort_manager
-from libs.table_utils import create_index_if_columns_exist
+from libs import catalog_cache, load_fingerprints, table_utils
+from libs.table_utils import create_index_if_columns_exist, insert_rows_batched, finish_bulk_load
+from libs.column_profiler import profile_columns, build_columns_ddl, get_table_column_types, fit_chunk_to_table, record_date_formats
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
 
 # Configuration
 from config import PROJECT_PATH as base_path
@@ -17,14 +30,80 @@ data_path = base_path / "SCFF" / "SCFF_Data"
 # Logging setup
 logger = logging.getLogger(__name__)
 
+# Columns that always keep these types; everything else is profiled by libs.column_profiler
+FIXED_COLUMN_TYPES = {"STUDENT_ID": "VARCHAR2(9)", "ACYR": "VARCHAR2(4)", "DATESTAMP": "VARCHAR2(6)"}
+
+# "pyarrow" reads extracts with pyarrow's CSV reader when it is installed; "c" always uses pandas' C engine
+SCFF_READ_ENGINE = "pyarrow"
+
+# Skip files whose datestamp is not newer than the one already loaded for their table and ACYR
+# (load_fingerprints.FORCE_RELOAD loads them anyway)
+DATESTAMP_SKIP = True
+
+# Rows per executemany batch; None uses table_utils.DEFAULT_BATCH_SIZE (batch_runner --batch-size)
+INSERT_BATCH_SIZE = None
+
+# Record numbers quoted per error in the insert error summary
+ERROR_SAMPLES = 3
+
+# Academic years loaded at once, each worker on its own connection and transaction (1 = one after another)
+LOAD_WORKERS = 1
+
+# Seconds a worker's DDL (new table, widened column) waits for another academic year's
+# uncommitted rows in the same table before failing with ORA-00054
+DDL_LOCK_TIMEOUT = 600
+
+# One lock per table: parallel academic years create, widen and retype a table one at a time
+_table_locks = {}
+_table_locks_lock = threading.Lock()
+
+# Per-run {table: {acyr: (max DATESTAMP, rows)}} of what the SCFF tables held when first read
+# (empty for tables that are missing or have no DATESTAMP column)
+_datestamp_marks = {}
+
 # Step 1: Clean column names to be Oracle compatible
 def clean_column_names(df):
     df.columns = [col.strip().replace(' ', '_').replace('-', '_').replace('.', '_').upper() for col in df.columns]
     return df
 
-# Step 2: Convert all values to strings
-def convert_to_string(df):
-    return df.astype(str).fillna('')
+# Step 2: Read a pipe-delimited extract with every value as a string ('' for blanks)
+def read_scff_file(file_path, engine=None):
+    """Returns the extract as a DataFrame of strings with cleaned column names, ready for load_data_to_db."""
+    if (engine or SCFF_READ_ENGINE) == "pyarrow" and pa_csv is not None:
+        try:
+            df = _read_with_pyarrow(file_path)
+            if df is not None:
+                return clean_column_names(df)
+            logger.warning(f'⚠️ pyarrow would not read {os.path.basename(file_path)} as plain text, using the C engine')
+        except (pa.ArrowInvalid, UnicodeDecodeError) as e:
+            logger.warning(f'⚠️ pyarrow could not read {os.path.basename(file_path)}, using the C engine: {e}')
+    return clean_column_names(pd.read_csv(file_path, sep="|", dtype=str, na_filter=False))
+
+def _read_with_pyarrow(file_path):
+    """
+    Reads the extract with every column as a non-null string, like dtype=str, na_filter=False;
+    the Arrow buffers are released column by column while the frame is built. Returns None
+    when the header or the column types would not match the C engine's result.
+    """
+    # The header is parsed with the same quoting rules as the data and handed to pyarrow,
+    # so quoted names still map to their string types
+    with open(file_path, encoding="utf-8-sig", newline="") as f:
+        header = next(csv.reader(f, delimiter="|"), [])
+    # Blank or repeated names are renamed by pandas ('Unnamed: n', 'X.1'); leave those to it
+    if not header or '' in header or len(set(header)) != len(header):
+        return None
+    table = pa_csv.read_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(column_names=header, skip_rows=1),
+        parse_options=pa_csv.ParseOptions(delimiter="|"),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in header},
+            strings_can_be_null=False, quoted_strings_can_be_null=False,
+        ),
+    )
+    if not all(pa.types.is_string(column_type) for column_type in table.schema.types):
+        return None
+    return table.to_pandas(split_blocks=True, self_destruct=True)
 
 # Step 3: Extract datestamp from filename
 def extract_datestamp(filename):
@@ -34,98 +113,283 @@ def extract_datestamp(filename):
 # Step 4: Check if table exists
 def table_exists(cursor, table_name):
     try:
-        cursor.execute(f"SELECT table_name FROM all_tables WHERE table_name = '{table_name}' AND owner = 'DWH'")
-        return cursor.fetchone() is not None
+        return catalog_cache.table_exists(cursor, "DWH", table_name)
     except oracledb.DatabaseError:
         return False
 
 # Step 5: Check if the datestamp column exists
 def column_exists(cursor, table_name, column_name):
     try:
-        cursor.execute(f"SELECT column_name FROM all_tab_columns WHERE table_name = '{table_name}' AND column_name = '{column_name}' AND owner = 'DWH'")
-        return cursor.fetchone() is not None
+        return catalog_cache.column_exists(cursor, "DWH", table_name, column_name)
     except oracledb.DatabaseError:
         return False
 
-# Step 6: Check if new datestamp is greater than existing
-def is_newer_datestamp(cursor, table_name, new_datestamp):
+# Step 6: Read the latest datestamp per ACYR of each table with one grouped query
+def reset_datestamp_marks():
+    _datestamp_marks.clear()
+
+def load_datestamp_marks(cursor, table_names):
+    """Caches MAX(DATESTAMP) and row count per ACYR of each of table_names (SCFF_* names) not read yet."""
+    tables = sorted({name.upper() for name in table_names} - _datestamp_marks.keys())
+    queries = [
+        f"SELECT '{name}', ACYR, MAX(DATESTAMP), COUNT(*) FROM DWH.{name} GROUP BY ACYR"
+        for name in tables
+        if column_exists(cursor, name, 'DATESTAMP') and column_exists(cursor, name, 'ACYR')
+    ]
+    for name in tables:
+        _datestamp_marks[name] = {}
+    if not queries:
+        return
+    try:
+        cursor.execute(' UNION ALL '.join(queries))
+        for name, acyr, datestamp, rows in cursor.fetchall():
+            _datestamp_marks[name][str(acyr)] = (datestamp, rows)
+    except oracledb.DatabaseError as e:
+        # Without the marks every file is treated as newer, as before
+        logger.warning(f'⚠️ Could not read loaded datestamps of {", ".join(tables)}: {e}')
+        return
+    logger.debug(f'📅 Read loaded datestamps of {len(queries)} SCFF table(s)')
+
+def loaded_datestamps(cursor, table_name):
+    """Returns {acyr: (max DATESTAMP, rows)} already loaded into table_name."""
+    if table_name.upper() not in _datestamp_marks:
+        load_datestamp_marks(cursor, [table_name])
+    return _datestamp_marks[table_name.upper()]
+
+# Step 7: Check if new datestamp is greater than existing (for acyr, or across all ACYRs)
+def is_newer_datestamp(cursor, table_name, new_datestamp, acyr=None):
     try:
-        if not column_exists(cursor, table_name, 'DATESTAMP'):
-            return True  # No datestamp column, treat as new
-        cursor.execute(f'SELECT MAX(DATESTAMP) FROM DWH.{table_name.upper()}')
-        result = cursor.fetchone()
-        if result and result[0] and int(new_datestamp) <= int(result[0]):
+        marks = loaded_datestamps(cursor, table_name)
+        if acyr is not None:
+            existing = marks.get(str(acyr), (None, 0))[0]
+        else:
+            existing = max((datestamp for datestamp, _ in marks.values() if datestamp), default=None)
+        if existing and int(new_datestamp) <= int(existing):
             return False
         return True
-    except oracledb.DatabaseError as e:
+    except (oracledb.DatabaseError, ValueError) as e:
         logger.error(f'Error checking datestamp for {table_name}: {e}')
         return True
 
-# Load data to DWHDB with Datestamp Check
-def load_data_to_db(table_name, acyr, datestamp, df, conn, cursor):
-    df = clean_column_names(df)
-    df = convert_to_string(df)
+def _table_lock(table_name):
+    with _table_locks_lock:
+        return _table_locks.setdefault(table_name.upper(), threading.Lock())
+
+# Load data to DWHDB with Datestamp Check (df as returned by read_scff_file)
+def load_data_to_db(table_name, acyr, datestamp, df, conn, cursor, bulk=None, stats=None):
+    if bulk is None:
+        bulk = table_utils.BULK_LOAD_MODE
     df['ACYR'] = acyr
     df['DATESTAMP'] = datestamp
     table_name = f'SCFF_{table_name}'
-    table_needs_create = not table_exists(cursor, table_name)
-    if table_needs_create:
-        create_table_query = f'CREATE TABLE DWH.{table_name.upper()} ({", ".join([
-            f'"{col}" VARCHAR2(9)' if col.upper() == "STUDENT_ID" else
-            f'"{col}" VARCHAR2(4)' if col.upper() == "ACYR" else
-            f'"{col}" VARCHAR2(4000)' for col in df.columns
-        ])})'
-        try:
-            cursor.execute(create_table_query)
-            cursor.execute(f'GRANT SELECT ON DWH.{table_name.upper()} TO PUBLIC')
-            abort_manager.register_created_table(table_name)
-            logger.info(f'Table {table_name} created and granted SELECT to PUBLIC.')
-        except oracledb.DatabaseError as e:
-            logger.error(f'Error creating table {table_name}: {e}')
+    # Parallel academic years change a table's definition one at a time (see _table_locks)
+    with _table_lock(table_name):
+        table_needs_create = not table_exists(cursor, table_name)
+        column_types = None
+        bulk_created = False
+        if table_needs_create:
+            column_types = profile_columns(df, FIXED_COLUMN_TYPES)
+            create_table_query = f'CREATE TABLE DWH.{table_name.upper()} ({build_columns_ddl(column_types)})'
+            try:
+                if bulk:
+                    # Grant and index are built by finish_bulk_load once the rows are in
+                    cursor.execute(f'{create_table_query} NOLOGGING')
+                    catalog_cache.note_table_created("DWH", table_name, column_types)
+                    record_date_formats(cursor, "DWH", table_name, df, column_types)
+                    abort_manager.register_created_table(table_name)
+                    bulk_created = True
+                    logger.info(f'Table {table_name} created NOLOGGING for bulk load.')
+                else:
+                    cursor.execute(create_table_query)
+                    catalog_cache.note_table_created("DWH", table_name, column_types)
+                    record_date_formats(cursor, "DWH", table_name, df, column_types)
+                    cursor.execute(f'GRANT SELECT ON DWH.{table_name.upper()} TO PUBLIC')
+                    abort_manager.register_created_table(table_name)
+                    logger.info(f'Table {table_name} created and granted SELECT to PUBLIC.')
+            except oracledb.DatabaseError as e:
+                logger.error(f'Error creating table {table_name}: {e}')
+                column_types = None
+
+        # Later academic years may not fit the types profiled from the first one; the types are
+        # re-read under the lock so another worker's widening is never undone
+        if column_types is None:
+            column_types = get_table_column_types(cursor, "DWH", table_name)
+        df = fit_chunk_to_table(cursor, "DWH", table_name, df, column_types, FIXED_COLUMN_TYPES)
 
     # ✅ Always attempt to create index (safely handles duplicates)
-    create_index_if_columns_exist(cursor, "DWH", table_name, ["STUDENT_ID", "ACYR"])
+    if not bulk_created:
+        create_index_if_columns_exist(cursor, "DWH", table_name, ["STUDENT_ID", "ACYR"])
 
     delete_query = f'DELETE FROM DWH.{table_name.upper()} WHERE ACYR = :1'
     cursor.execute(delete_query, [acyr])
     logger.info(f'Deleted existing records for ACYR {acyr} from {table_name}.')
 
     insert_query = f'INSERT INTO DWH.{table_name.upper()} ({', '.join([f'"{col}"' for col in df.columns])}) VALUES ({', '.join([f':{i+1}' for i in range(len(df.columns))])})'
-    for _, row in df.iterrows():
-        if abort_manager.should_abort:
-            abort_manager.cleanup_on_abort(conn, cursor)
-            return False
-        try:
-            cursor.execute(insert_query, tuple(row))
-        except oracledb.DatabaseError as e:
-            logger.error(f'Failed to insert row into {table_name}: {e}')
 
-    logger.info(f'Loaded {len(df)} rows into {table_name} after deleting old records.')
+    insert_errors = []
+    result = insert_rows_batched(
+        cursor, conn, insert_query, df.itertuples(index=False, name=None),
+        f'DWH.{table_name}', batch_size=INSERT_BATCH_SIZE, direct_path=bulk_created, rejects=insert_errors
+    )
+    if result is None:
+        return False
+    if bulk_created:
+        finish_bulk_load(cursor, "DWH", table_name, ["STUDENT_ID", "ACYR"])
+    if insert_errors:
+        _log_insert_errors(table_name, insert_errors)
+    if stats is not None:
+        stats.update(rows=result[0], failed=result[1])
+    mode = ', direct-path' if bulk_created else ''
+    logger.info(f'Loaded {result[0]} rows into {table_name} after deleting old records ({result[1]} failed{mode}).')
     return True
 
+def _log_insert_errors(table_name, insert_errors):
+    # One line per ORA- code with its count, first message and a few data-row numbers
+    reasons = {}
+    for row_number, _, message in insert_errors:
+        match = re.match(r'ORA-\d+', message)
+        reason = reasons.setdefault(match.group(0) if match else message, [0, message, []])
+        reason[0] += 1
+        if len(reason[2]) < ERROR_SAMPLES:
+            reason[2].append(str(row_number + 1))
+    for count, message, samples in sorted(reasons.values(), key=lambda reason: -reason[0]):
+        logger.error(f'❌ {table_name}: {count} rows failed to insert (e.g. rows {", ".join(samples)}): {message}')
+
+def _latest_table_names(latest_path):
+    return [f"SCFF_{file.split('_')[0]}" for file in os.listdir(latest_path) if file.endswith('.txt')]
+
 # Main data loading process
-def process_latest_files(latest_path, acyr, conn, cursor):
+def process_latest_files(latest_path, acyr, conn, cursor, pending_fingerprints=None):
     for file in os.listdir(latest_path):
         if abort_manager.should_abort:
             abort_manager.cleanup_on_abort(conn, cursor)
             return False
         if file.endswith('.txt'):
-            file_path = os.path.join(latest_path, file)
-            table_name = file.split('_')[0]
-            datestamp = extract_datestamp(file)
-            logger.info(f'Processing {file} into table SCFF_{table_name} with datestamp {datestamp}...')
             try:
-                df = pd.read_csv(file_path, sep="|", dtype=str)
-                df = clean_column_names(df)
-                df = convert_to_string(df)
-                if not load_data_to_db(table_name, acyr, datestamp, df, conn, cursor):
+                stats = {}
+                if not load_scff_file(os.path.join(latest_path, file), acyr, conn, cursor, stats=stats):
                     return False
+                if pending_fingerprints is not None and "fingerprint" in stats:
+                    pending_fingerprints.append(stats)
             except Exception as e:
                 logger.error(f'Error processing {file}: {e}')
     return True
 
+# Each load replaces one ACYR of the table, so fingerprints are kept per table and ACYR
+def scff_load_target(table_name, acyr):
+    return f'DWH.SCFF_{table_name.upper()}:{acyr}'
+
+# Load one pipe-delimited SCFF extract (table name and datestamp come from the file name)
+# stats receives "rows"/"failed"/"seconds", plus "fingerprint" and "target" to record once committed,
+# or "skipped" when the file's content, or a datestamp at least as new, is already loaded for this ACYR
+def load_scff_file(file_path, acyr, conn, cursor, table_name=None, stats=None):
+    started = time.perf_counter()
+    file = os.path.basename(file_path)
+    table_name = table_name or file.split('_')[0]
+    datestamp = extract_datestamp(file)
+    target = scff_load_target(table_name, acyr)
+    if DATESTAMP_SKIP and datestamp and not load_fingerprints.FORCE_RELOAD:
+        if not is_newer_datestamp(cursor, f'SCFF_{table_name}', datestamp, acyr):
+            loaded, rows = loaded_datestamps(cursor, f'SCFF_{table_name}')[str(acyr)]
+            load_fingerprints.note_skipped(file_path, target, rows, f"datestamp {datestamp} not newer than {loaded}",
+                                           database=load_fingerprints.database_identity(conn))
+            logger.info(f'⏭️ Skipping {file}: SCFF_{table_name} already holds datestamp {loaded} for ACYR {acyr} ({rows} rows)')
+            if stats is not None:
+                stats.update(skipped=True)
+            return True
+    unchanged, fingerprint = load_fingerprints.check_unchanged(file_path, target, cursor, where=("ACYR", acyr))
+    if unchanged:
+        if stats is not None:
+            stats.update(skipped=True)
+        return True
+    if stats is not None:
+        stats.update(fingerprint=fingerprint, target=target)
+    logger.info(f'Processing {file} into table SCFF_{table_name} with datestamp {datestamp}...')
+    df = read_scff_file(file_path)
+    loaded = load_data_to_db(table_name, acyr, datestamp, df, conn, cursor, stats=stats)
+    if stats is not None:
+        stats.update(seconds=round(time.perf_counter() - started, 3))
+    return loaded
+
+
+def _academic_year_jobs(academic_years):
+    # (academic_year, acyr, latest_path) for each folder with a derivable ACYR and a Latest folder
+    jobs = []
+    for academic_year in academic_years:
+        try:
+            acyr = str(2000 + int(academic_year[:2]))
+        except Exception:
+            logger.warning(f"⚠️ Could not derive ACYR from folder name '{academic_year}'. Skipping.")
+            continue
+
+        latest_path = os.path.join(data_path, academic_year, 'Latest')
+        if os.path.exists(latest_path):
+            jobs.append((academic_year, acyr, latest_path))
+        else:
+            logger.error(f'No Latest folder found for academic year: {academic_year}')
+    return jobs
+
+def load_academic_year(conn, cursor, academic_year, acyr, latest_path):
+    """Loads one academic year's Latest folder and commits it. Returns False if it was rolled back."""
+    logger.info(f'Loading data from Latest folder for academic year: {academic_year}, derived ACYR: {acyr}')
+    pending_fingerprints = []
+    if not process_latest_files(latest_path, acyr, conn, cursor, pending_fingerprints):
+        logger.warning(f"⏪ Rolled back records for ACYR {acyr}")
+        return False
+    conn.commit()
+    for stats in pending_fingerprints:
+        load_fingerprints.record_load(stats["target"], stats["fingerprint"], stats.get("rows"), stats.get("seconds"))
+    logger.info(f"✅ Committed records for ACYR {acyr}")
+    return True
+
+def _load_academic_year_worker(academic_year, acyr, latest_path):
+    # Each worker owns its connection and transaction: commit on success, rollback/drop on abort
+    if abort_manager.should_abort:
+        return False
+
+    conn = get_worker_connection(force_shared=True)
+    if not conn:
+        logger.error(f"❌ Worker could not connect to Oracle for ACYR {acyr}.")
+        return False
+
+    cursor = conn.cursor()
+    try:
+        # Academic years share tables, so DDL waits for the others' open transactions to commit
+        cursor.execute(f'ALTER SESSION SET DDL_LOCK_TIMEOUT = {int(DDL_LOCK_TIMEOUT)}')
+        return load_academic_year(conn, cursor, academic_year, acyr, latest_path)
+    except Exception as e:
+        logger.error(f"❌ Worker failed on ACYR {acyr}: {e}")
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return False
+    finally:
+        abort_manager.release_created_tables()
+        try:
+            cursor.close()
+            conn.close()
+        except Exception:
+            pass
+
+def load_academic_years_parallel(jobs, workers):
+    """
+    Runs (academic_year, acyr, latest_path) jobs on a thread pool of `workers`, one Oracle
+    connection and transaction per academic year. Returns the number of years committed.
+    """
+    logger.info(f"🧵 Loading {len(jobs)} academic years with {workers} parallel workers")
+    committed = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scff_data_loader") as pool:
+        futures = [pool.submit(_load_academic_year_worker, *job) for job in jobs]
+        for future in as_completed(futures):
+            committed += future.result()
+    return committed
 
-def run_scff_loader(existing_conn=None):
+def run_scff_loader(existing_conn=None, workers=None):
+    """
+    GUI entry point. workers > 1 loads academic years in parallel (see LOAD_WORKERS);
+    otherwise they load one after another on a single connection.
+    """
     from tkinter import _default_root
     conn = existing_conn or get_db_connection(force_shared=True, root=_default_root)
 
@@ -134,33 +398,30 @@ def run_scff_loader(existing_conn=None):
         return
     cursor = conn.cursor()
 
-    from libs import abort_manager
     abort_manager.reset()
+    load_fingerprints.reset_skipped()
+    catalog_cache.reset()
+    reset_datestamp_marks()
+    workers = workers or LOAD_WORKERS
 
     academic_years = [d for d in os.listdir(data_path) if os.path.isdir(os.path.join(data_path, d))]
-    for academic_year in academic_years:
+    jobs = _academic_year_jobs(academic_years)
+    if DATESTAMP_SKIP:
+        load_datestamp_marks(cursor, [name for _, _, latest_path in jobs for name in _latest_table_names(latest_path)])
+
+    if workers > 1 and len(jobs) > 1:
+        load_academic_years_parallel(jobs, workers)
         if abort_manager.should_abort:
             logger.warning("⏹️ SCFF Loader aborted by user.")
-            break
-
-        try:
-            acyr = str(2000 + int(academic_year[:2]))
-        except Exception:
-            logger.warning(f"⚠️ Could not derive ACYR from folder name '{academic_year}'. Skipping.")
-            continue
-
-        latest_path = os.path.join(data_path, academic_year, 'Latest')
-        if os.path.exists(latest_path):
-            logger.info(f'Loading data from Latest folder for academic year: {academic_year}, derived ACYR: {acyr}')
-            success = process_latest_files(latest_path, acyr, conn, cursor)
-            if success:
-                conn.commit()
-                logger.info(f"✅ Committed records for ACYR {acyr}")
-            else:
-                logger.warning(f"⏪ Rolled back records for ACYR {acyr}")
+    else:
+        for job in jobs:
+            if abort_manager.should_abort:
+                logger.warning("⏹️ SCFF Loader aborted by user.")
                 break
-        else:
-            logger.error(f'No Latest folder found for academic year: {academic_year}')
+            if not load_academic_year(conn, cursor, *job):
+                break
+
+    load_fingerprints.log_skipped_summary()
 
     try:
         cursor.close()